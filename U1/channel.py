@@ -0,0 +1,97 @@
+import asyncio
+import time
+
+from nonebot import logger
+from sqlalchemy import select
+
+from U1.database import get_session
+from U1.model import Channel
+
+
+class ChannelCache:
+    """
+    :说明: `ChannelCache`
+    > 频道指派机器人的进程内缓存 (guildId -> assignee)
+
+    启动时整表加载，超过 `ttl` 后在后台整表刷新，刷新完成前继续使用旧数据；
+    未知群组会进入负缓存，在 `negative_ttl` 内不会再次查询数据库。
+    """
+
+    def __init__(self, ttl: float = 60, negative_ttl: float = 10):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._assignees: dict[str, str | None] = {}
+        self._missing: dict[str, float] = {}
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+        self._refreshing: asyncio.Task[None] | None = None
+
+    async def load(self):
+        """整表加载频道指派信息"""
+        async with self._lock:
+            async with get_session() as session:
+                result = await session.execute(
+                    select(Channel.guildId, Channel.assignee).where(
+                        Channel.guildId.is_not(None)
+                    )
+                )
+                rows = result.all()
+            self._assignees = {str(guild_id): assignee for guild_id, assignee in rows}
+            self._missing.clear()
+            self._loaded_at = time.monotonic()
+        logger.debug(f"频道缓存已加载 {len(self._assignees)} 条记录")
+
+    async def _refresh(self):
+        try:
+            await self.load()
+        except Exception:
+            logger.opt(exception=True).warning("频道缓存刷新失败，继续使用旧数据")
+            # 等待下一个 ttl 周期再重试，避免每个事件都触发刷新
+            self._loaded_at = time.monotonic()
+
+    def invalidate(self, guild_id: str | None = None):
+        """
+        使缓存失效，不传 `guild_id` 时下次访问会整表刷新
+
+        仓库内没有写入频道表的代码，外部修改频道表后可调用此方法立即生效
+        """
+        if guild_id is None:
+            self._loaded_at = 0.0
+            return
+        self._assignees.pop(guild_id, None)
+        self._missing.pop(guild_id, None)
+
+    async def get_assignee(self, guild_id: str) -> tuple[bool, str | None]:
+        """
+        获取群组指派的机器人
+
+        :返回: `(是否找到频道, assignee)`
+        """
+        now = time.monotonic()
+        if not self._loaded_at:
+            await self.load()
+        elif now - self._loaded_at > self.ttl and (
+            self._refreshing is None or self._refreshing.done()
+        ):
+            self._refreshing = asyncio.create_task(self._refresh())
+
+        if guild_id in self._assignees:
+            return True, self._assignees[guild_id]
+
+        if self._missing.get(guild_id, 0) > now:
+            return False, None
+
+        async with get_session() as session:
+            result = await session.execute(
+                select(Channel.assignee).where(Channel.guildId == guild_id).limit(1)
+            )
+            row = result.first()
+        if row is None:
+            self._missing[guild_id] = now + self.negative_ttl
+            return False, None
+
+        self._assignees[guild_id] = row.assignee
+        return True, row.assignee
+
+
+channel_cache = ChannelCache()
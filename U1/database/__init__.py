@@ -1,78 +1,76 @@
-from nonebot import get_driver, get_plugin_config, logger
-from tortoise import Tortoise
-from ujson import dumps
+from collections.abc import Callable, Sequence
+from typing import Any
 
-from .config import Config
+from nonebot import get_plugin_config, logger, require
 
-driver = get_driver()
-plugin_config: Config = get_plugin_config(Config)
+require("nonebot_plugin_orm")
 
-db_url: str = plugin_config.tortoise_orm_db_url
-DATABASE: dict = {
-    "connections": {"default": db_url},
-    "apps": {
-        "default": {
-            "models": [],
-            "default_connection": "default",
-        }
-    },
-    "use_tz": False,
-    "timezone": "Asia/Shanghai",
-}
+from nonebot_plugin_orm import Model, get_session
+from nonebot_plugin_orm import plugin_config as orm_config
+from sqlalchemy import Insert
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
 
-models: list[str] = []
+from .config import Config
 
+__all__ = ["Model", "get_session", "upsert"]
 
-async def connect():
-    # await Tortoise.init(db_url=DB_URL, modules={"models": moduls})
-    DATABASE["apps"]["default"]["models"] = models
+plugin_config: Config = get_plugin_config(Config)
 
-    logger.info("参数预览\n" + dumps(DATABASE, ensure_ascii=False, indent=4))
 
-    await Tortoise.init(DATABASE)
-    await Tortoise.generate_schemas()
+def configure_pool():
+    """
+    :说明: `configure_pool`
+    > 将连接池参数合并进 `nonebot_plugin_orm` 的引擎配置
 
-    for db in DATABASE["connections"].keys():
-        db_url = DATABASE["connections"][db].split("@", maxsplit=1)[-1]
-        logger.opt(colors=True).success(
-            f"<y>数据库: {db} 连接成功</y> URL: <r>{db_url}</r>"
+    全进程共用 `nonebot_plugin_orm` 管理的同一个引擎，
+    已在 `SQLALCHEMY_ENGINE_OPTIONS` 中显式配置的项不会被覆盖。
+    """
+    pool_options = {
+        "pool_size": plugin_config.db_pool_size,
+        "max_overflow": plugin_config.db_max_overflow,
+        "pool_recycle": plugin_config.db_pool_recycle,
+    }
+    for key, value in pool_options.items():
+        if value is not None:
+            orm_config.sqlalchemy_engine_options.setdefault(key, value)
+
+    if orm_config.sqlalchemy_engine_options:
+        logger.opt(colors=True).info(
+            f"<y>数据库: 引擎参数</y> {orm_config.sqlalchemy_engine_options}"
         )
 
 
-async def disconnect():
-    await Tortoise.close_connections()
-    logger.opt(colors=True).success("<y>数据库: 断开链接</y>")
-
-
-def add_model(model: str, db_name: str | None = None, db_url: str | None = None):
+def upsert(
+    session: AsyncSession,
+    model: type[Model],
+    values: dict | list[dict],
+    index_elements: Sequence[str],
+    **on_conflict: Callable[[Any], Any],
+) -> Insert:
     """
-    :说明: `add_model`
-    > 添加数据模型
+    :说明: `upsert`
+    > 按唯一索引构造 INSERT ... ON CONFLICT / ON DUPLICATE KEY UPDATE
 
     :参数:
-      * `model: str`: 模型位置/名称
-            - 如果发布插件可以为 `__name__` 或 插件名称.模型所在文件 例如 `abc.models`
-            - 如果是作为 Bot 插件形式 需按照相对路径填写 例如 `plugins.test.models`
-
-    :可选参数: 该可选参数必须同时使用
-
-    仅在需要自定义某插件独立数据库时需要，否则将会使用默认 `db_url` 存放在默认位置
-
-      * `db_name: Optional[str] = None`: 数据库名称
-      * `db_url: Optional[str] = None`: 数据库URL [参考](https://tortoise.github.io/databases.html#db-url)
+      * `model`: 目标模型
+      * `values`: 单行或多行数据
+      * `index_elements`: 冲突判断使用的唯一索引列（MySQL 会使用表上任意唯一索引）
+      * `**on_conflict`: 列名 -> 函数，函数接收「待插入行」的列集合，返回冲突时该列的新值
     """
-    if bool(db_name) != bool(db_url):
-        raise TypeError("db_name 和 db_url 必须同时为 None 或 str")
-
-    if db_name and db_url:
-        DATABASE["connections"][db_name] = db_url
-        DATABASE["apps"][db_name] = {"models": []}
-        DATABASE["apps"][db_name]["default_connection"] = db_name
-        DATABASE["apps"][db_name]["models"].append(model)
-        logger.opt(colors=True).success(
-            f"<y>数据库: 添加模型 {db_name}</y>: <r>{model}</r>"
+    dialect = session.get_bind(model).dialect.name
+    if dialect in ("mysql", "mariadb"):
+        stmt = mysql.insert(model).values(values)
+        return stmt.on_duplicate_key_update(
+            {key: func(stmt.inserted) for key, func in on_conflict.items()}
         )
 
-    else:
-        models.append(model)
-        logger.opt(colors=True).success(f"<y>数据库: 添加模型</y>: <r>{model}</r>")
+    module = postgresql if dialect == "postgresql" else sqlite
+    stmt = module.insert(model).values(values)
+    return stmt.on_conflict_do_update(
+        index_elements=list(index_elements),
+        set_={key: func(stmt.excluded) for key, func in on_conflict.items()},
+    )
+
+
+configure_pool()
@@ -2,4 +2,7 @@ from pydantic import BaseModel
 
 
 class Config(BaseModel):
-    tortoise_orm_db_url: str
+    # 连接池参数，留空则使用 SQLALCHEMY_ENGINE_OPTIONS 或 SQLAlchemy 默认值
+    db_pool_size: int | None = None
+    db_max_overflow: int | None = None
+    db_pool_recycle: int | None = None
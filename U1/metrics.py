@@ -0,0 +1,121 @@
+"""进程内指标存储，输出 Prometheus 文本格式（由 metrics 插件暴露）"""
+
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from collections import defaultdict
+
+LabelValues = tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple[str, ...], values: LabelValues, **extra: str) -> str:
+    pairs = [*zip(names, values), *extra.items()]
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(str(v))}"' for k, v in pairs) + "}"
+
+
+class Metric(ABC):
+    type_ = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = labels
+        registry.append(self)
+
+    @abstractmethod
+    def samples(self) -> list[str]:
+        """当前所有样本行，不含 HELP / TYPE"""
+
+    def render(self) -> str:
+        return "\n".join(
+            [
+                f"# HELP {self.name} {self.documentation}",
+                f"# TYPE {self.name} {self.type_}",
+                *self.samples(),
+            ]
+        )
+
+
+class Counter(Metric):
+    type_ = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: dict[LabelValues, float] = defaultdict(float)
+
+    def inc(self, *labels: str, amount: float = 1):
+        self._values[labels] += amount
+
+    def samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labels, labels)} {value}"
+            for labels, value in self._values.items()
+        ]
+
+
+class Gauge(Metric):
+    type_ = "gauge"
+
+    def __init__(self, name: str, documentation: str, labels: tuple[str, ...] = ()):
+        super().__init__(name, documentation, labels)
+        self._values: dict[LabelValues, float] = {}
+
+    def set(self, value: float, *labels: str):
+        self._values[labels] = value
+
+    def samples(self) -> list[str]:
+        return [
+            f"{self.name}{_format_labels(self.labels, labels)} {value}"
+            for labels, value in self._values.items()
+        ]
+
+
+class Histogram(Metric):
+    type_ = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: tuple[str, ...] = (),
+        buckets: list[float] | None = None,
+    ):
+        super().__init__(name, documentation, labels)
+        self.buckets = sorted(buckets or [0.01, 0.1, 1, 10])
+        # 每个标签组合: [各分桶计数..., +Inf 计数], 总和
+        self._counts: dict[LabelValues, list[int]] = {}
+        self._sums: dict[LabelValues, float] = defaultdict(float)
+
+    def observe(self, value: float, *labels: str):
+        counts = self._counts.get(labels)
+        if counts is None:
+            counts = self._counts[labels] = [0] * (len(self.buckets) + 1)
+        counts[bisect_left(self.buckets, value)] += 1
+        self._sums[labels] += value
+
+    def samples(self) -> list[str]:
+        lines = []
+        for labels, counts in self._counts.items():
+            cumulative = 0
+            for bound, count in zip([*self.buckets, "+Inf"], counts):
+                cumulative += count
+                lines.append(
+                    f"{self.name}_bucket"
+                    f"{_format_labels(self.labels, labels, le=str(bound))} {cumulative}"
+                )
+            label_str = _format_labels(self.labels, labels)
+            lines.append(f"{self.name}_sum{label_str} {self._sums[labels]}")
+            lines.append(f"{self.name}_count{label_str} {cumulative}")
+        return lines
+
+
+registry: list[Metric] = []
+
+
+def render_all() -> str:
+    return "\n".join(metric.render() for metric in registry) + "\n"
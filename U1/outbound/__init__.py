@@ -0,0 +1,272 @@
+import asyncio
+import itertools
+import time
+from contextvars import ContextVar
+from typing import Any
+
+from nonebot import get_driver, get_plugin_config
+from nonebot.adapters import Bot
+
+from .config import Config
+from .delayed import TimerWheel
+
+__all__ = [
+    "PRIORITY_HIGH",
+    "PRIORITY_LOW",
+    "PRIORITY_NORMAL",
+    "OutboundClosed",
+    "OutboundScheduler",
+    "TimerWheel",
+    "TokenBucket",
+    "delayed",
+    "outbound",
+]
+
+plugin_config: Config = get_plugin_config(Config)
+driver = get_driver()
+
+# 数值越小越先执行
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 5
+PRIORITY_LOW = 10
+
+# 当前调用是否由调度器发出，用于在 on_calling_api 钩子中跳过重复限速
+_scheduled: ContextVar[bool] = ContextVar("outbound_scheduled", default=False)
+
+# api -> 动作类别，不在表中的 api 不限速
+ACTION_CLASSES = {
+    **dict.fromkeys(
+        (
+            "send_msg",
+            "send_group_msg",
+            "send_private_msg",
+            "send_group_forward_msg",
+            "send_private_forward_msg",
+        ),
+        "send",
+    ),
+    "set_group_leave": "leave",
+    **dict.fromkeys(
+        (
+            "get_group_list",
+            "get_group_info",
+            "get_group_member_list",
+            "get_group_member_info",
+            "get_friend_list",
+            "get_stranger_info",
+        ),
+        "query",
+    ),
+}
+
+
+class TokenBucket:
+    """令牌桶，每秒补充 `rate` 个令牌，最多积攒 `capacity` 个"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+
+    async def acquire(self):
+        while True:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return
+            await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class OutboundClosed(RuntimeError):
+    """调度器关闭（机器人断开或停止运行）时，尚在排队的动作以此异常结束"""
+
+
+QueueItem = tuple[int, int, str, dict[str, Any], asyncio.Future]
+
+
+class ActionQueue:
+    """单个机器人单类动作的优先队列，由一个后台任务按令牌桶速率取出执行"""
+
+    def __init__(self, bot: Bot, bucket: TokenBucket, maxsize: int, concurrency: int):
+        self.bot = bot
+        self.bucket = bucket
+        self.queue: asyncio.PriorityQueue[QueueItem] = asyncio.PriorityQueue(maxsize)
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._running: set[asyncio.Task] = set()
+        # 已从队列取出、正在等待并发名额或令牌的动作
+        self._current: asyncio.Future | None = None
+        self.closed = False
+        self._worker = asyncio.create_task(self._work())
+
+    async def _work(self):
+        while True:
+            _, _, api, data, future = await self.queue.get()
+            if future.done():
+                # 调用方已取消
+                continue
+            self._current = future
+            await self._semaphore.acquire()
+            await self.bucket.acquire()
+            self._current = None
+            task = asyncio.create_task(self._call(api, data, future))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _call(self, api: str, data: dict[str, Any], future: asyncio.Future):
+        _scheduled.set(True)
+        try:
+            result = await self.bot.call_api(api, **data)
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+        else:
+            if not future.done():
+                future.set_result(result)
+        finally:
+            self._semaphore.release()
+
+    def close(self):
+        """停止取出新动作，尚在排队和等待令牌的动作以 `OutboundClosed` 结束"""
+        self.closed = True
+        self._worker.cancel()
+        futures = [item[-1] for item in self._drain()]
+        if self._current is not None:
+            futures.append(self._current)
+            self._current = None
+        for future in futures:
+            _fail_closed(future)
+
+    def _drain(self) -> list[QueueItem]:
+        items = []
+        while not self.queue.empty():
+            items.append(self.queue.get_nowait())
+        return items
+
+
+def _fail_closed(future: asyncio.Future):
+    if not future.done():
+        future.set_exception(OutboundClosed("outbound closed"))
+        # 避免无人等待时出现 "exception was never retrieved"
+        future.exception()
+
+
+class OutboundScheduler:
+    """
+    :说明: `OutboundScheduler`
+    > 按机器人、动作类别（发送消息 / 退群 / 查询）排队并限速的 OneBot 动作调度器
+
+    插件提交动作后拿到 future，无需在调用之间手动 `sleep`；
+    队列满时 `submit` 会等待，对上游形成背压。
+    直接调用 `bot.send` 等未经调度器的动作默认不限速；开启
+    `outbound_throttle_direct` 后由 `on_calling_api` 钩子共用同一个令牌桶，
+    但不参与排队和优先级。
+    """
+
+    def __init__(
+        self,
+        limits: dict[str, tuple[float, int]],
+        maxsize: int = 200,
+        concurrency: int = 4,
+    ):
+        self.limits = limits
+        self.maxsize = maxsize
+        self.concurrency = concurrency
+        self._queues: dict[tuple[str, str], ActionQueue] = {}
+        self._seq = itertools.count()
+
+    def _get_queue(self, bot: Bot, action: str) -> ActionQueue:
+        key = (bot.self_id, action)
+        if (queue := self._queues.get(key)) is None or queue.bot is not bot:
+            if queue is not None:
+                # 机器人重连后是新的 Bot 实例
+                queue.close()
+            queue = ActionQueue(
+                bot, TokenBucket(*self.limits[action]), self.maxsize, self.concurrency
+            )
+            self._queues[key] = queue
+        return queue
+
+    async def submit(
+        self, bot: Bot, api: str, priority: int = PRIORITY_NORMAL, **data: Any
+    ) -> asyncio.Future:
+        """
+        :说明: `submit`
+        > 提交一个动作，返回动作结果的 future
+
+        :参数:
+          * `bot: Bot`: 执行动作的机器人
+          * `api: str`: OneBot API 名称
+          * `priority: int = PRIORITY_NORMAL`: 优先级，数值越小越先执行
+          * `**data`: API 参数
+        """
+        action = ACTION_CLASSES.get(api)
+        if action is None or action not in self.limits:
+            return asyncio.ensure_future(bot.call_api(api, **data))
+
+        future = asyncio.get_running_loop().create_future()
+        queue = self._get_queue(bot, action)
+        await queue.queue.put((priority, next(self._seq), api, data, future))
+        if queue.closed:
+            # 排队等待期间队列被关闭（机器人断开），不会再有人取出
+            queue._drain()
+            raise OutboundClosed("outbound closed")
+        return future
+
+    async def call(
+        self, bot: Bot, api: str, priority: int = PRIORITY_NORMAL, **data: Any
+    ) -> Any:
+        """提交动作并等待结果"""
+        return await (await self.submit(bot, api, priority, **data))
+
+    async def throttle(self, bot: Bot, api: str):
+        """为未经调度器发出的动作等待令牌"""
+        if _scheduled.get():
+            return
+        action = ACTION_CLASSES.get(api)
+        if action is None or action not in self.limits:
+            return
+        await self._get_queue(bot, action).bucket.acquire()
+
+    def close(self, bot_id: str | None = None):
+        """关闭指定机器人（默认全部）的队列"""
+        for key in [key for key in self._queues if bot_id in (None, key[0])]:
+            self._queues.pop(key).close()
+
+
+outbound = OutboundScheduler(
+    {
+        "send": plugin_config.outbound_send_rate,
+        "leave": plugin_config.outbound_leave_rate,
+        "query": plugin_config.outbound_query_rate,
+    },
+    maxsize=plugin_config.outbound_queue_size,
+    concurrency=plugin_config.outbound_concurrency,
+)
+delayed = TimerWheel(
+    outbound,
+    tick=plugin_config.outbound_delay_tick,
+    slots=plugin_config.outbound_delay_slots,
+)
+
+
+if plugin_config.outbound_throttle_direct:
+
+    @Bot.on_calling_api
+    async def _(bot: Bot, api: str, data: dict[str, Any]):
+        await outbound.throttle(bot, api)
+
+
+@driver.on_bot_disconnect
+async def _(bot: Bot):
+    outbound.close(bot.self_id)
+
+
+@driver.on_shutdown
+async def _():
+    await delayed.close()
+    outbound.close()
@@ -0,0 +1,18 @@
+from pydantic import BaseModel
+
+
+class Config(BaseModel):
+    # 各类动作的令牌桶参数：(每秒补充的令牌数, 桶容量)
+    outbound_send_rate: tuple[float, int] = (2.0, 5)
+    outbound_leave_rate: tuple[float, int] = (1.0, 3)
+    outbound_query_rate: tuple[float, int] = (10.0, 20)
+    # 每个机器人每类动作的排队上限，队列满时 submit 会等待
+    outbound_queue_size: int = 200
+    # 每个机器人每类动作同时进行中的调用数上限
+    outbound_concurrency: int = 4
+    # 是否让直接调用的 bot.send 等动作也共用令牌桶限速（不排队），
+    # 开启后所有事件处理器的发送都会受 outbound_send_rate 约束
+    outbound_throttle_direct: bool = False
+    # 延迟投递时间轮：每格的时长（秒）与格数
+    outbound_delay_tick: float = 0.1
+    outbound_delay_slots: int = 512
@@ -0,0 +1,172 @@
+"""延迟投递：哈希时间轮 + 单个驱动任务，到期消息按 tick 批量交给出站调度器"""
+
+import asyncio
+import math
+from typing import TYPE_CHECKING, Any
+
+from nonebot import get_bots, logger
+from nonebot.adapters import Bot
+from nonebot.adapters.onebot.v11 import (
+    GroupMessageEvent,
+    Message,
+    MessageEvent,
+    MessageSegment,
+)
+
+from U1.metrics import Gauge, Histogram
+
+if TYPE_CHECKING:
+    from . import OutboundScheduler
+
+delayed_pending = Gauge("u1_delayed_pending", "延迟投递时间轮中等待的消息数")
+delayed_lateness = Histogram(
+    "u1_delayed_lateness_seconds",
+    "延迟投递实际交付时间相对预定时间的滞后",
+    buckets=[0.05, 0.1, 0.25, 0.5, 1, 2.5, 5],
+)
+
+# (剩余圈数, 预定时间, 机器人 ID, api, 参数)
+WheelEntry = list[Any]
+
+
+class TimerWheel:
+    """
+    :说明: `TimerWheel`
+    > 哈希时间轮，`tick` 秒转动一格，共 `slots` 格
+
+    条目按到期时刻对应的绝对格数放入时间轮，超过一圈的记录剩余圈数，
+    每转到所在格时减一；事件循环卡顿后补转多格时也不会提前投递。
+    时间轮为空时驱动任务挂起，不会空转。
+    """
+
+    def __init__(
+        self, scheduler: "OutboundScheduler", tick: float = 0.1, slots: int = 512
+    ):
+        self.scheduler = scheduler
+        self.tick = tick
+        self.slots: list[list[WheelEntry]] = [[] for _ in range(slots)]
+        self._cursor = 0
+        self._size = 0
+        self._started_at = 0.0
+        # 自 _started_at 起已转过的格数
+        self._ticks = 0
+        self._wakeup = asyncio.Event()
+        self._task: asyncio.Task | None = None
+        self._delivering: set[asyncio.Task] = set()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def schedule(
+        self, bot: Bot, delay: float, api: str = "send_msg", **data: Any
+    ) -> None:
+        """
+        :说明: `schedule`
+        > 在 `delay` 秒后通过出站调度器调用 `api`
+
+        投递时按机器人 ID 取当前在线的 Bot，重连后仍能送达
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+        loop = asyncio.get_running_loop()
+        if not self._size:
+            # 从空闲恢复，重新对齐时间轮起点
+            self._started_at = loop.time()
+            self._ticks = 0
+
+        # 第 n 格在 _started_at + n * tick 之后才会转到，按绝对格数放置，
+        # 与游标是否因卡顿落后无关
+        due_at = loop.time() + delay
+        due_tick = max(
+            self._ticks + 1, math.ceil((due_at - self._started_at) / self.tick)
+        )
+        ahead = due_tick - self._ticks
+        slot = (self._cursor + ahead) % len(self.slots)
+        rounds = (ahead - 1) // len(self.slots)
+        self.slots[slot].append([rounds, due_at, bot.self_id, api, data])
+        self._size += 1
+        delayed_pending.set(self._size)
+        self._wakeup.set()
+
+    def reply_later(
+        self,
+        bot: Bot,
+        event: MessageEvent,
+        message: str | Message | MessageSegment,
+        delay: float,
+        *,
+        reply_message: bool = False,
+    ) -> None:
+        """在 `delay` 秒后回复消息事件，参数含义同 `bot.send`"""
+        if reply_message:
+            message = MessageSegment.reply(event.message_id) + message
+        if isinstance(event, GroupMessageEvent):
+            target = {"message_type": "group", "group_id": event.group_id}
+        else:
+            target = {"message_type": "private", "user_id": event.user_id}
+        self.schedule(bot, delay, "send_msg", message=message, **target)
+
+    def _advance(self) -> list[WheelEntry]:
+        """转动一格，返回该格中到期的条目"""
+        self._ticks += 1
+        self._cursor = (self._cursor + 1) % len(self.slots)
+        slot = self.slots[self._cursor]
+        due = [entry for entry in slot if entry[0] == 0]
+        if due:
+            slot[:] = [entry for entry in slot if entry[0] > 0]
+        for entry in slot:
+            entry[0] -= 1
+        return due
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self._size:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+
+            next_tick = self._ticks + 1
+            await asyncio.sleep(
+                max(0.0, self._started_at + next_tick * self.tick - loop.time())
+            )
+            # 事件循环繁忙导致睡过头时，一次补转到当前时刻对应的格
+            current = max(next_tick, int((loop.time() - self._started_at) / self.tick))
+            batch = []
+            while self._ticks < current:
+                batch += self._advance()
+
+            if batch:
+                self._size -= len(batch)
+                delayed_pending.set(self._size)
+                task = asyncio.create_task(self._deliver(batch))
+                self._delivering.add(task)
+                task.add_done_callback(self._delivering.discard)
+
+    async def _deliver(self, batch: list[WheelEntry]):
+        now = asyncio.get_running_loop().time()
+        bots = get_bots()
+        calls = []
+        for _, due_at, bot_id, api, data in batch:
+            delayed_lateness.observe(max(0.0, now - due_at))
+            if (bot := bots.get(bot_id)) is None:
+                logger.debug(f"延迟投递: 机器人 {bot_id} 已离线，丢弃 {api}")
+                continue
+            calls.append(self.scheduler.call(bot, api, **data))
+
+        for result in await asyncio.gather(*calls, return_exceptions=True):
+            if isinstance(result, BaseException):
+                logger.opt(exception=result).warning("延迟投递失败")
+
+    async def close(self):
+        """停止时间轮，尚未到期的消息直接丢弃"""
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._size:
+            logger.warning(f"延迟投递: 停止时仍有 {self._size} 条消息未到期，已丢弃")
+        for slot in self.slots:
+            slot.clear()
+        self._size = 0
+        delayed_pending.set(0)
+        if self._delivering:
+            await asyncio.gather(*self._delivering, return_exceptions=True)
@@ -1,24 +1,88 @@
+from importlib.util import find_spec
+from urllib.parse import urlsplit
+
 import httpx
+from nonebot import get_driver
 from nonebot import logger as log
 
-if timeout := 5:
-    timeout = httpx.Timeout(timeout)
-proxy = {}
+driver = get_driver()
+
+DEFAULT_TIMEOUT = httpx.Timeout(5)
+DEFAULT_LIMITS = httpx.Limits(
+    max_connections=20, max_keepalive_connections=10, keepalive_expiry=30
+)
+# 安装了 h2 时启用 HTTP/2
+http2 = find_spec("h2") is not None
+
+# host -> (timeout, limits)，未配置的 host 使用上面的默认值
+host_options: dict[str, tuple[httpx.Timeout, httpx.Limits]] = {}
+_clients: dict[tuple[str, str | None, bool], httpx.AsyncClient] = {}
+
+
+def configure_host(
+    host: str,
+    *,
+    timeout: httpx.Timeout | float | None = None,
+    limits: httpx.Limits | None = None,
+):
+    """
+    :说明: `configure_host`
+    > 为指定 host 设置单独的超时与连接数限制，需在该 host 的客户端创建前调用
+    """
+    host_options[host] = (
+        httpx.Timeout(timeout) if timeout is not None else DEFAULT_TIMEOUT,
+        limits or DEFAULT_LIMITS,
+    )
+
+
+def get_client(
+    url: str, *, proxy: str | None = None, verify: bool = True
+) -> httpx.AsyncClient:
+    """
+    :说明: `get_client`
+    > 获取 `url` 所在 host 的长连接客户端，同一 host 复用同一个连接池
+
+    :参数:
+      * `url: str`: 请求地址或 host
+      * `proxy: str | None = None`: 代理地址
+      * `verify: bool = True`: 是否校验证书
+    """
+    host = urlsplit(url).netloc or url
+    key = (host, proxy, verify)
+    if (client := _clients.get(key)) is None or client.is_closed:
+        host_timeout, host_limits = host_options.get(
+            host, (DEFAULT_TIMEOUT, DEFAULT_LIMITS)
+        )
+        client = httpx.AsyncClient(
+            proxy=proxy,
+            verify=verify,
+            timeout=host_timeout,
+            limits=host_limits,
+            http2=http2,
+            follow_redirects=True,
+        )
+        _clients[key] = client
+        log.debug(f"创建 HTTP 客户端 {host} by {proxy or 'No proxy'}")
+    return client
+
+
+@driver.on_shutdown
+async def close_clients():
+    for client in _clients.values():
+        await client.aclose()
+    _clients.clear()
 
 
-async def get(url: str, **kwargs):
-    log.debug(f"GET {url} by {proxy or 'No proxy'} | MORE: \n {kwargs}")
-    async with httpx.AsyncClient(proxies=proxy, timeout=timeout) as client:  # type: ignore
-        return await client.get(url, **kwargs)
+async def get(url: str, **kwargs) -> httpx.Response:
+    log.debug(f"GET {url} | MORE: \n {kwargs}")
+    return await get_client(url).get(url, **kwargs)
 
 
-async def post(url: str, **kwargs):
-    log.debug(f"POST {url} by {proxy or 'No proxy'} | MORE: \n {kwargs}")
-    async with httpx.AsyncClient(proxies=proxy, timeout=timeout) as client:  # type: ignore
-        return await client.post(url, **kwargs)
+async def post(url: str, **kwargs) -> httpx.Response:
+    log.debug(f"POST {url} | MORE: \n {kwargs}")
+    return await get_client(url).post(url, **kwargs)
 
 
-async def delete(url: str, **kwargs):
-    log.debug(f"DELETE {url} by {proxy or 'No proxy'} | MORE: \n {kwargs}")
-    async with httpx.AsyncClient(proxies=proxy, timeout=timeout) as client:  # type: ignore
-        return await client.delete(url, **kwargs)
+async def delete(url: str, **kwargs) -> httpx.Response:
+    log.debug(f"DELETE {url} | MORE: \n {kwargs}")
+    return await get_client(url).delete(url, **kwargs)
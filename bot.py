@@ -1,4 +1,3 @@
-import asyncio
 import os
 import sys
 from typing import TYPE_CHECKING
@@ -55,28 +54,16 @@ driver = nonebot.get_driver()
 driver.register_adapter(ONEBOT_V11Adapter)
 
 
-@driver.on_startup
-async def connect_db():
-    from U1.database import connect
-
-    await connect()
-
-
-@driver.on_shutdown
-async def disconnect_db():
-    from U1.database import disconnect
-
-    await disconnect()
-
-
 nonebot.load_from_toml("pyproject.toml")
 from nonebot.message import event_preprocessor
 
-from U1.model import Channel
+from U1.channel import channel_cache
 
 
-async def get_channel(group_id: str):
-    return await Channel.get_or_none(guildId=group_id)
+# 需在插件加载后注册，保证 nonebot_plugin_orm 的引擎先于此初始化
+@driver.on_startup
+async def load_channel_cache():
+    await channel_cache.load()
 
 
 @event_preprocessor
@@ -86,18 +73,12 @@ async def _(bot: Bot, event: GroupMessageEvent):
     if event.to_me:
         return
 
-    channel = await get_channel(str(event.group_id))
-    if channel is None:
-        for _ in range(3):
-            channel = await get_channel(str(event.group_id))
-            if channel is not None:
-                break  # 重试直到找到频道
-            await asyncio.sleep(0.5)
-
-    if channel is None:
+    # 命中内存缓存时不访问数据库，未知群组由负缓存短时间拦截
+    found, assignee = await channel_cache.get_assignee(str(event.group_id))
+    if not found:
         raise IgnoredException("未找到频道，忽略")
 
-    if channel.assignee != bot_qqid:
+    if assignee != bot_qqid:
         raise IgnoredException("机器人不是频道指定的机器人，忽略")
 
 
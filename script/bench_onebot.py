@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+OneBot v11 压测脚本 - 模拟协议端向 bot.py 推送群消息并统计吞吐
+
+脚本以子进程方式启动 bot.py (``--serve`` 模式)，自身扮演反向 WebSocket 协议端：
+按目标速率推送混合指令的群消息事件，并用固定数据应答 get_group_member_list、
+get_group_member_info、send_group_msg 等 API 调用。结束后从 metrics 插件的
+Prometheus 路由读取处理器耗时直方图与数据库查询计数，输出 p50/p99 耗时、
+events/s 与每事件数据库查询数。
+
+用法::
+
+    python script/bench_onebot.py --rate 200 --duration 60
+    python script/bench_onebot.py --db-url mysql+aiomysql://u:p@127.0.0.1/bench \\
+        --mix 钓鱼=5,娶群友=2,chatter=10
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import re
+import secrets
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import httpx
+import ujson as json
+import websockets
+
+ROOT = Path(__file__).resolve().parent.parent
+
+DEFAULT_MIX = {
+    "钓鱼": 5,
+    "娶群友": 2,
+    "回声洞": 2,
+    "早安": 1,
+    "晚安": 1,
+    "点歌 晴天": 1,
+    "chatter": 10,  # 不命中任何事件响应器的闲聊
+}
+CHATTER = ["哈哈哈", "今天吃什么好呢", "+1", "有人吗", "好耶", "？", "草"]
+
+
+@dataclass
+class BenchStats:
+    """压测过程中协议端侧的统计"""
+
+    sent_events: int = 0
+    api_calls: dict[str, int] = field(default_factory=dict)
+    started_at: float = 0.0
+    finished_at: float = 0.0
+
+    @property
+    def duration(self) -> float:
+        return max(self.finished_at - self.started_at, 1e-9)
+
+
+class FakeOneBot:
+    """反向 WebSocket 协议端，API 调用全部由固定数据应答"""
+
+    def __init__(self, self_id: int, groups: list[int], members_per_group: int):
+        self.self_id = self_id
+        self.groups = groups
+        self.members = {
+            group_id: [
+                {
+                    "group_id": group_id,
+                    "user_id": 10000 + i,
+                    "nickname": f"群友{i}",
+                    "card": "",
+                    "role": "member",
+                    "last_sent_time": int(time.time()) - i * 60,
+                }
+                for i in range(members_per_group)
+            ]
+            for group_id in groups
+        }
+        self.stats = BenchStats()
+        self._message_id = 0
+
+    def next_message_id(self) -> int:
+        self._message_id += 1
+        return self._message_id
+
+    def answer(self, action: str, params: dict):
+        """根据 action 返回固定数据"""
+        self.stats.api_calls[action] = self.stats.api_calls.get(action, 0) + 1
+        group_id = params.get("group_id")
+        if action == "get_login_info":
+            return {"user_id": self.self_id, "nickname": "bench"}
+        if action == "get_group_member_list":
+            return self.members.get(group_id, [])
+        if action == "get_group_member_info":
+            for member in self.members.get(group_id, []):
+                if member["user_id"] == params.get("user_id"):
+                    return member
+            return {
+                "group_id": group_id,
+                "user_id": params.get("user_id"),
+                "nickname": "路人",
+                "card": "",
+                "role": "member",
+            }
+        if action == "get_group_list":
+            return [
+                {"group_id": g, "group_name": f"压测群{g}", "member_count": len(m)}
+                for g, m in self.members.items()
+            ]
+        if action in {"get_friend_list"}:
+            return []
+        if action in {"get_stranger_info"}:
+            return {"user_id": params.get("user_id"), "nickname": "路人"}
+        if action.startswith("send_"):
+            return {"message_id": self.next_message_id()}
+        return None
+
+    def make_event(self, text: str) -> dict:
+        group_id = random.choice(self.groups)
+        user = random.choice(self.members[group_id])
+        return {
+            "time": int(time.time()),
+            "self_id": self.self_id,
+            "post_type": "message",
+            "message_type": "group",
+            "sub_type": "normal",
+            "message_id": self.next_message_id(),
+            "group_id": group_id,
+            "user_id": user["user_id"],
+            "anonymous": None,
+            "message": [{"type": "text", "data": {"text": text}}],
+            "raw_message": text,
+            "font": 0,
+            "sender": {
+                "user_id": user["user_id"],
+                "nickname": user["nickname"],
+                "card": user["card"],
+                "role": "member",
+            },
+        }
+
+    async def serve_api(self, ws):
+        async for raw in ws:
+            data = json.loads(raw)
+            if "action" not in data:
+                continue
+            await ws.send(
+                json.dumps(
+                    {
+                        "status": "ok",
+                        "retcode": 0,
+                        "data": self.answer(data["action"], data.get("params", {})),
+                        "echo": data.get("echo"),
+                    }
+                )
+            )
+
+    async def run(self, url: str, mix: dict[str, int], rate: float, duration: float):
+        headers = {"X-Self-ID": str(self.self_id), "X-Client-Role": "Universal"}
+        async with websockets.connect(url, additional_headers=headers) as ws:
+            api_task = asyncio.create_task(self.serve_api(ws))
+            commands = list(mix)
+            weights = list(mix.values())
+            interval = 1 / rate
+            self.stats.started_at = time.perf_counter()
+            deadline = self.stats.started_at + duration
+            next_at = self.stats.started_at
+            while (now := time.perf_counter()) < deadline:
+                if next_at > now:
+                    await asyncio.sleep(next_at - now)
+                command = random.choices(commands, weights)[0]
+                text = random.choice(CHATTER) if command == "chatter" else command
+                await ws.send(json.dumps(self.make_event(text)))
+                self.stats.sent_events += 1
+                next_at += interval
+            self.stats.finished_at = time.perf_counter()
+            # 给仍在处理中的事件留出时间
+            await asyncio.sleep(5)
+            api_task.cancel()
+
+
+def parse_mix(value: str | None) -> dict[str, int]:
+    if not value:
+        return DEFAULT_MIX
+    mix = {}
+    for item in value.split(","):
+        command, _, weight = item.partition("=")
+        mix[command.strip()] = int(weight or 1)
+    return mix
+
+
+def parse_metrics(text: str) -> dict[str, list[tuple[dict[str, str], float]]]:
+    """解析 Prometheus 文本格式为 {指标名: [(标签, 值), ...]}"""
+    metrics: dict[str, list[tuple[dict[str, str], float]]] = {}
+    pattern = re.compile(r"^([a-zA-Z_:][\w:]*)(?:\{(.*)\})? (\S+)$")
+    for line in text.splitlines():
+        if not line or line.startswith("#"):
+            continue
+        if not (matched := pattern.match(line)):
+            continue
+        name, labels, value = matched.groups()
+        label_dict = dict(re.findall(r'(\w+)="((?:[^"\\]|\\.)*)"', labels or ""))
+        metrics.setdefault(name, []).append((label_dict, float(value)))
+    return metrics
+
+
+def histogram_quantile(q: float, buckets: list[tuple[float, float]]) -> float:
+    """按 Prometheus histogram_quantile 的方式在分桶内线性插值"""
+    buckets = sorted(buckets)
+    total = buckets[-1][1] if buckets else 0
+    if total == 0:
+        return 0.0
+    rank = q * total
+    prev_bound, prev_count = 0.0, 0.0
+    for bound, count in buckets:
+        if count >= rank:
+            if bound == float("inf"):
+                return prev_bound
+            span = count - prev_count
+            return prev_bound + (bound - prev_bound) * (
+                (rank - prev_count) / span if span else 0
+            )
+        prev_bound, prev_count = bound, count
+    return prev_bound
+
+
+def report(stats: BenchStats, before: dict, after: dict):
+    def total(metrics: dict, name: str) -> float:
+        return sum(value for _, value in metrics.get(name, []))
+
+    def buckets(metrics: dict) -> dict[float, float]:
+        merged: dict[float, float] = {}
+        for labels, value in metrics.get("u1_matcher_latency_seconds_bucket", []):
+            bound = float(labels["le"])
+            merged[bound] = merged.get(bound, 0) + value
+        return merged
+
+    before_buckets = buckets(before)
+    latency = [
+        (bound, count - before_buckets.get(bound, 0))
+        for bound, count in buckets(after).items()
+    ]
+    events = total(after, "u1_events_total") - total(before, "u1_events_total")
+    queries = total(after, "u1_db_queries_total") - total(before, "u1_db_queries_total")
+
+    print("📊 压测结果")
+    print("====================")
+    print(
+        f"发送事件数: {stats.sent_events} ({stats.sent_events / stats.duration:.1f}/s)"
+    )
+    print(f"处理事件数: {events:.0f} ({events / stats.duration:.1f}/s)")
+    print(f"处理器耗时 p50: {histogram_quantile(0.5, latency) * 1000:.1f}ms")
+    print(f"处理器耗时 p99: {histogram_quantile(0.99, latency) * 1000:.1f}ms")
+    print(f"每事件数据库查询数: {queries / events if events else 0:.2f}")
+    print("API 调用:")
+    for action, count in sorted(stats.api_calls.items(), key=lambda x: -x[1]):
+        print(f"  {action}: {count}")
+
+
+async def wait_ready(base_url: str, token: str, startup_timeout: float = 60):
+    async with httpx.AsyncClient(
+        headers={"Authorization": f"Bearer {token}"}
+    ) as client:
+        deadline = time.monotonic() + startup_timeout
+        while time.monotonic() < deadline:
+            try:
+                if (await client.get(f"{base_url}/metrics")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.5)
+    raise TimeoutError("bot.py 启动超时")
+
+
+async def scrape(base_url: str, token: str) -> dict:
+    async with httpx.AsyncClient(
+        headers={"Authorization": f"Bearer {token}"}
+    ) as client:
+        response = await client.get(f"{base_url}/metrics")
+        response.raise_for_status()
+        return parse_metrics(response.text)
+
+
+async def bench(args: argparse.Namespace):
+    base_url = f"http://127.0.0.1:{args.port}"
+    groups = [900000 + i for i in range(args.groups)]
+    # 为子进程生成一次性指标令牌，覆盖 .env 中的配置
+    token = secrets.token_hex(16)
+    env = {
+        **os.environ,
+        "HOST": "127.0.0.1",
+        "PORT": str(args.port),
+        "SQLALCHEMY_DATABASE_URL": args.db_url,
+        "ALEMBIC_STARTUP_CHECK": "false",
+        "METRICS_TOKEN": token,
+        "BENCH_SELF_ID": str(args.self_id),
+        "BENCH_GROUPS": ",".join(map(str, groups)),
+    }
+    server = await asyncio.create_subprocess_exec(
+        sys.executable,
+        __file__,
+        "--serve",
+        cwd=ROOT,
+        env=env,
+        stdout=None if args.verbose else asyncio.subprocess.DEVNULL,
+        stderr=None if args.verbose else asyncio.subprocess.DEVNULL,
+    )
+    try:
+        await wait_ready(base_url, token)
+        fake = FakeOneBot(args.self_id, groups, args.members)
+        before = await scrape(base_url, token)
+        await fake.run(
+            f"ws://127.0.0.1:{args.port}/onebot/v11/ws",
+            parse_mix(args.mix),
+            args.rate,
+            args.duration,
+        )
+        report(fake.stats, before, await scrape(base_url, token))
+    finally:
+        server.terminate()
+        await asyncio.wait_for(server.wait(), 30)
+
+
+def serve():
+    """在子进程中加载 bot.py，建表、写入压测群频道并统计数据库查询"""
+    sys.path.insert(0, str(ROOT))
+    os.chdir(ROOT)
+    import bot
+    from nonebot_plugin_orm import Model
+    from sqlalchemy import Engine, delete, event
+    from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+    from U1.model import Channel
+
+    self_id = os.environ["BENCH_SELF_ID"]
+    groups = os.environ["BENCH_GROUPS"].split(",")
+
+    # 插件已加载，模型齐全；在 bot 启动前建表并写入压测群的频道指派
+    async def prepare_db():
+        engine = create_async_engine(os.environ["SQLALCHEMY_DATABASE_URL"])
+        async with engine.begin() as connection:
+            await connection.run_sync(Model.metadata.create_all)
+        async with AsyncSession(engine) as session:
+            await session.execute(delete(Channel).where(Channel.guildId.in_(groups)))
+            session.add_all(
+                Channel(
+                    id=f"bench-{group_id}",
+                    platform="onebot",
+                    flag=int(group_id),
+                    assignee=self_id,
+                    guildId=group_id,
+                )
+                for group_id in groups
+            )
+            await session.commit()
+        await engine.dispose()
+
+    asyncio.run(prepare_db())
+
+    from U1.metrics import Counter
+
+    db_queries_total = Counter("u1_db_queries_total", "数据库查询次数")
+
+    @event.listens_for(Engine, "before_cursor_execute")
+    def count_query(*_):
+        db_queries_total.inc()
+
+    bot.nonebot.run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OneBot v11 压测工具")
+    parser.add_argument("--serve", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--rate", type=float, default=100, help="目标事件速率 (条/s)")
+    parser.add_argument("--duration", type=float, default=30, help="压测时长 (s)")
+    parser.add_argument("--mix", help="指令权重，如 钓鱼=5,娶群友=2,chatter=10")
+    parser.add_argument("--groups", type=int, default=20, help="模拟群数量")
+    parser.add_argument("--members", type=int, default=500, help="每群成员数")
+    parser.add_argument("--self-id", type=int, default=123456789)
+    parser.add_argument("--port", type=int, default=18080)
+    parser.add_argument(
+        "--db-url",
+        default=f"sqlite+aiosqlite:///{ROOT / 'bench.db'}",
+        help="压测使用的数据库，默认本地 SQLite",
+    )
+    parser.add_argument("--verbose", action="store_true", help="输出 bot 日志")
+    args = parser.parse_args()
+
+    if args.serve:
+        serve()
+    else:
+        asyncio.run(bench(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,7 @@ import asyncio
 import os
 import statistics
 from dataclasses import dataclass
+from datetime import datetime, timedelta
 
 import aiomysql
 from dotenv import load_dotenv
@@ -45,6 +46,18 @@ class CoinAnalysisResult:
     recommended_prices: dict[str, float]  # 推荐价格策略
 
 
+@dataclass
+class LedgerFlow:
+    """按来源汇总的金币流水"""
+
+    source: str
+    reason: str
+    entries: int
+    users: int
+    income: float
+    expense: float
+
+
 class CoinAnalyzer:
     """货币数据分析器"""
 
@@ -132,6 +145,58 @@ class CoinAnalyzer:
         finally:
             conn.close()
 
+    async def fetch_ledger_flows(self, days: int = 30) -> list[LedgerFlow]:
+        """获取最近 `days` 天按来源汇总的金币流水（走 created_at 索引）"""
+        since = datetime.now() - timedelta(days=days)
+        conn = await self.get_connection()
+        try:
+            async with conn.cursor(aiomysql.DictCursor) as cursor:
+                await cursor.execute(
+                    """
+                    SELECT source, reason, COUNT(*) AS entries,
+                           COUNT(DISTINCT user_id) AS users,
+                           SUM(CASE WHEN delta > 0 THEN delta ELSE 0 END) AS income,
+                           SUM(CASE WHEN delta < 0 THEN -delta ELSE 0 END) AS expense
+                    FROM coin_ledger
+                    WHERE created_at >= %s
+                    GROUP BY source, reason
+                    ORDER BY entries DESC
+                    """,
+                    (since,),
+                )
+                rows = await cursor.fetchall()
+                return [
+                    LedgerFlow(
+                        source=row["source"] or "未知",
+                        reason=row["reason"] or "未知",
+                        entries=int(row["entries"]),
+                        users=int(row["users"]),
+                        income=float(row["income"] or 0),
+                        expense=float(row["expense"] or 0),
+                    )
+                    for row in rows
+                ]
+        finally:
+            conn.close()
+
+    def print_ledger_report(self, flows: list[LedgerFlow], days: int = 30):
+        """打印流水汇总"""
+        print(f"\n🧾 最近 {days} 天金币流水:")
+        if not flows:
+            print("  暂无流水记录")
+            return
+        for flow in flows:
+            print(
+                f"  [{flow.source}] {flow.reason}: {flow.entries}笔 {flow.users}人 "
+                f"收入 {flow.income:.1f} 支出 {flow.expense:.1f}"
+            )
+        total_income = sum(flow.income for flow in flows)
+        total_expense = sum(flow.expense for flow in flows)
+        print(
+            f"  合计: 收入 {total_income:.1f} 支出 {total_expense:.1f} "
+            f"净流入 {total_income - total_expense:.1f}"
+        )
+
     def analyze_coin_data(self, user_stats: list[UserCoinStats]) -> CoinAnalysisResult:
         """分析货币数据"""
         if not user_stats:
@@ -333,8 +398,13 @@ async def main():
         # 输出报告
         analyzer.print_analysis_report(result)
 
+        # 流水汇总
+        print("📥 正在获取金币流水...")
+        flows = await analyzer.fetch_ledger_flows()
+        analyzer.print_ledger_report(flows)
+
         # 保存详细数据到文件
-        await save_detailed_analysis(user_stats, result)
+        await save_detailed_analysis(user_stats, result, flows)
 
     except Exception as e:
         print(f"❌ 分析过程中出错: {e}")
@@ -344,11 +414,13 @@ async def main():
 
 
 async def save_detailed_analysis(
-    user_stats: list[UserCoinStats], result: CoinAnalysisResult
+    user_stats: list[UserCoinStats],
+    result: CoinAnalysisResult,
+    flows: list[LedgerFlow],
 ):
     """保存详细分析数据到文件"""
     import json
-    from datetime import datetime
+    from dataclasses import asdict
 
     # 准备导出数据
     export_data = {
@@ -362,6 +434,7 @@ async def save_detailed_analysis(
             "spending_patterns": result.spending_patterns,
             "recommended_prices": result.recommended_prices,
         },
+        "ledger_flows": [asdict(flow) for flow in flows],
         "user_details": [
             {
                 "user_id": user.user_id,
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+钓鱼经济模拟器 - 离线评估鱼的权重、价格与长度范围
+
+直接加载钓鱼插件读取当前配置（品质权重、单价、长度范围、运势加成），
+先按运势星级给出每竿收益的期望与标准差，再用 NumPy 向量化模拟
+大量用户一整年的钓鱼收入：每个「用户-天」的竿数服从泊松分布，
+同一运势下各品质条数服从多项分布，同品质鱼总长度用正态近似，
+单次模拟不需要逐竿采样。
+
+依赖 numpy（``pip install numpy``）。用法::
+
+    python script/fishing_economy.py
+    python script/fishing_economy.py --users 100000 --days 365 --casts 30
+    python script/fishing_economy.py --weight 金=8 --price 虚空=0.15 \\
+        --long 隐火=1000-3000 --max-weight-increase 20 --json economy.json
+"""
+
+import argparse
+import json
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# 没有抽今日运势时的状态下标（星级 0~7 之后）
+NO_FORTUNE = 8
+# 每次向量化处理的用户数，控制内存占用
+CHUNK_USERS = 100_000
+
+
+@dataclass
+class LuckReport:
+    """某个运势状态下的单竿收益"""
+
+    luck: str
+    probability: float  # 用户处于该状态的概率
+    quality_rates: dict[str, float]
+    mean_per_cast: float
+    std_per_cast: float
+    income_per_hour: float  # 按冷却时间满速钓鱼
+
+
+@dataclass
+class SimulationResult:
+    """年度模拟结果"""
+
+    users: int
+    days: int
+    casts: int
+    elapsed: float
+    quality_frequency: dict[str, float]
+    mean_income: float
+    std_income: float
+    percentiles: dict[str, float]
+    mean_income_per_hour: float
+
+
+def load_fishing():
+    """初始化 NoneBot 并加载钓鱼插件，返回其 data_source 模块"""
+    import nonebot
+
+    sys.path.insert(0, str(ROOT))
+    nonebot.init(_env_file=str(ROOT / ".env"))
+    nonebot.load_plugin("src.plugins.fishing")
+
+    from src.plugins.fishing import data_source
+
+    return data_source
+
+
+def parse_overrides(values: list[str], cast=float) -> dict:
+    overrides = {}
+    for value in values:
+        quality, _, number = value.partition("=")
+        overrides[quality.strip()] = cast(number)
+    return overrides
+
+
+def apply_overrides(data_source, args: argparse.Namespace):
+    """临时覆盖插件中的品质参数，只影响本次模拟"""
+    for quality, weight in parse_overrides(args.weight, int).items():
+        data_source.fish[quality]["weight"] = weight
+    for quality, price in parse_overrides(args.price).items():
+        data_source.fish[quality]["price_mpr"] = price
+    for quality, long in parse_overrides(args.long, str).items():
+        low, _, high = long.partition("-")
+        data_source.fish[quality]["long"] = (int(low), int(high))
+    if args.max_weight_increase is not None:
+        data_source.MAX_WEIGHT_INCREASE = args.max_weight_increase
+    data_source.get_cum_weights.cache_clear()
+
+
+def luck_distribution(fortune_rate: float) -> np.ndarray:
+    """按 Fortune.json 中各星级签的数量，得到 9 个运势状态的概率"""
+    fortune = json.loads(
+        (ROOT / "src/plugins/today_yunshi/Fortune.json").read_text(encoding="utf-8")
+    )
+    stars = np.bincount(
+        [item.get("星级", "").count("★") for item in fortune.values()], minlength=8
+    )[:8]
+    probs = np.zeros(NO_FORTUNE + 1)
+    probs[:8] = fortune_rate * stars / stars.sum()
+    probs[NO_FORTUNE] = 1 - fortune_rate
+    return probs
+
+
+def quality_table(data_source) -> tuple[list[str], np.ndarray, np.ndarray]:
+    """
+    :返回: (品质列表, 各运势状态下的品质概率 [9, Q], 每条鱼长度的均值与方差 [2, Q])
+    """
+    qualities = list(data_source.FISH_QUALITIES)
+    probs = np.empty((NO_FORTUNE + 1, len(qualities)))
+    for state in range(NO_FORTUNE + 1):
+        cum = np.asarray(
+            data_source.get_cum_weights(None if state == NO_FORTUNE else state),
+            dtype=float,
+        )
+        probs[state] = np.diff(cum, prepend=0) / cum[-1]
+
+    # random.randint(a, b) 为闭区间离散均匀分布
+    low, high = np.array([data_source.fish[q]["long"] for q in qualities]).T
+    length = np.stack([(low + high) / 2, ((high - low + 1) ** 2 - 1) / 12])
+    return qualities, probs, length
+
+
+def luck_reports(
+    data_source, luck_probs: np.ndarray, casts_per_hour: float
+) -> list[LuckReport]:
+    qualities, probs, (mean_len, var_len) = quality_table(data_source)
+    price = np.array([data_source.fish[q]["price_mpr"] for q in qualities])
+
+    # 单竿收益 X = price_q * L_q，按全期望 / 全方差公式计算
+    mean = probs @ (price * mean_len)
+    second = probs @ (price**2 * (var_len + mean_len**2))
+    std = np.sqrt(second - mean**2)
+    return [
+        LuckReport(
+            luck="无运势" if state == NO_FORTUNE else f"{state} 星",
+            probability=float(luck_probs[state]),
+            quality_rates=dict(zip(qualities, probs[state].round(4).tolist())),
+            mean_per_cast=float(mean[state]),
+            std_per_cast=float(std[state]),
+            income_per_hour=float(mean[state] * casts_per_hour),
+        )
+        for state in range(NO_FORTUNE + 1)
+    ]
+
+
+def simulate(
+    data_source,
+    luck_probs: np.ndarray,
+    args: argparse.Namespace,
+    casts_per_hour: float,
+) -> SimulationResult:
+    """
+    按用户分块向量化模拟整段时间
+
+    各天相互独立，因此一年的结果可以直接按「运势状态」汇总采样：
+    活跃天数 ~ 二项分布，活跃天在各运势间 ~ 多项分布，
+    某运势下的总竿数 ~ 泊松分布（泊松之和仍为泊松），
+    各品质条数 ~ 多项分布，与逐天、逐竿采样同分布
+    """
+    rng = np.random.default_rng(args.seed)
+    qualities, probs, (mean_len, var_len) = quality_table(data_source)
+    price = np.array([data_source.fish[q]["price_mpr"] for q in qualities])
+    min_len = np.array([data_source.fish[q]["long"][0] for q in qualities])
+
+    income = np.empty(args.users)
+    casts_total = np.empty(args.users, dtype=np.int64)
+    quality_counts = np.zeros(len(qualities), dtype=np.int64)
+
+    started = time.perf_counter()
+    for start in range(0, args.users, CHUNK_USERS):
+        users = min(CHUNK_USERS, args.users - start)
+        active_days = rng.binomial(args.days, args.active, users)
+        state_days = rng.multinomial(active_days, luck_probs)  # [用户, 运势]
+        casts = rng.poisson(args.casts * state_days)
+        # [用户, 运势, 品质]，每个运势使用各自的品质概率
+        counts = rng.multinomial(casts, probs).sum(axis=1)
+        quality_counts += counts.sum(axis=0)
+        # 同品质 c 条鱼的总长度 ≈ N(c·μ, c·σ²)，且不小于 c·最短长度
+        length = rng.normal(counts * mean_len, np.sqrt(counts * var_len))
+        length = np.maximum(length, counts * min_len)
+
+        income[start : start + users] = length @ price
+        casts_total[start : start + users] = casts.sum(axis=1)
+    elapsed = time.perf_counter() - started
+
+    hours = casts_total / casts_per_hour
+    played = hours > 0
+    return SimulationResult(
+        users=args.users,
+        days=args.days,
+        casts=int(casts_total.sum()),
+        elapsed=elapsed,
+        quality_frequency=dict(
+            zip(qualities, (quality_counts / quality_counts.sum()).round(6).tolist())
+        ),
+        mean_income=float(income.mean()),
+        std_income=float(income.std()),
+        percentiles={
+            f"p{p}": float(v)
+            for p, v in zip((10, 50, 90, 99), np.percentile(income, (10, 50, 90, 99)))
+        },
+        mean_income_per_hour=float(income[played].sum() / hours[played].sum()),
+    )
+
+
+def print_report(coin_name: str, reports: list[LuckReport], result: SimulationResult):
+    print("\n🎣 单竿收益（按运势）")
+    print("=" * 60)
+    qualities = list(reports[0].quality_rates)
+    print(
+        f"{'运势':<6}{'占比':>7}{'期望':>9}{'标准差':>9}{'每小时':>10}  "
+        + " ".join(f"{q:>6}" for q in qualities)
+    )
+    for report in reports:
+        print(
+            f"{report.luck:<6}{report.probability:>7.1%}"
+            f"{report.mean_per_cast:>9.2f}{report.std_per_cast:>9.2f}"
+            f"{report.income_per_hour:>10.1f}  "
+            + " ".join(f"{rate:>6.1%}" for rate in report.quality_rates.values())
+        )
+
+    print(f"\n📈 年度模拟（{result.users} 用户 × {result.days} 天）")
+    print("=" * 60)
+    print(f"总竿数: {result.casts}，耗时 {result.elapsed:.2f}s")
+    print("品质出现频率:")
+    for quality, rate in result.quality_frequency.items():
+        print(f"  {quality:<4} {rate:.4%}")
+    print(
+        f"人均收入: {result.mean_income:.1f} {coin_name}"
+        f"（标准差 {result.std_income:.1f}）"
+    )
+    print(
+        "收入分位: " + "，".join(f"{k} {v:.1f}" for k, v in result.percentiles.items())
+    )
+    print(f"活跃时每小时收入: {result.mean_income_per_hour:.1f} {coin_name}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="钓鱼经济模拟器")
+    parser.add_argument("--users", type=int, default=100_000, help="模拟用户数")
+    parser.add_argument("--days", type=int, default=365, help="模拟天数")
+    parser.add_argument("--casts", type=float, default=30, help="活跃日人均竿数")
+    parser.add_argument("--active", type=float, default=0.3, help="每天活跃概率")
+    parser.add_argument("--fortune", type=float, default=0.5, help="每天抽运势的概率")
+    parser.add_argument(
+        "--weight", action="append", default=[], help="覆盖品质权重，如 金=8"
+    )
+    parser.add_argument(
+        "--price", action="append", default=[], help="覆盖每厘米单价，如 金=0.2"
+    )
+    parser.add_argument(
+        "--long", action="append", default=[], help="覆盖长度范围，如 金=100-600"
+    )
+    parser.add_argument("--max-weight-increase", type=int, help="覆盖权重增加上限")
+    parser.add_argument("--seed", type=int, help="随机种子")
+    parser.add_argument("--json", help="将结果导出为 JSON 文件")
+    args = parser.parse_args()
+
+    data_source = load_fishing()
+    apply_overrides(data_source, args)
+    casts_per_hour = 3600 / data_source.config.fishing_limit
+
+    luck_probs = luck_distribution(args.fortune)
+    reports = luck_reports(data_source, luck_probs, casts_per_hour)
+    result = simulate(data_source, luck_probs, args, casts_per_hour)
+    print_report(data_source.fishing_coin_name, reports, result)
+
+    if args.json:
+        Path(args.json).write_text(
+            json.dumps(
+                {
+                    "luck": [asdict(report) for report in reports],
+                    "simulation": asdict(result),
+                },
+                ensure_ascii=False,
+                indent=2,
+            ),
+            encoding="utf-8",
+        )
+        print(f"\n💾 结果已导出到 {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -9,6 +9,8 @@ from nonebot.adapters.onebot.v11 import (
     RequestEvent,
 )
 
+from ..group_member import bot_group_index
+
 # 获取超级用户的id
 SUPERUSER_list = list(get_driver().config.superusers)
 
@@ -34,51 +36,40 @@ async def check_bot_priority_in_group(
     bots = get_bots()
     current_bot_priority = BOT_PRIORITY.get(current_bot_id, 0)
 
-    # 检查其他机器人是否在这个群组中
-    for bot_id_str, bot in bots.items():
-        bot_id = int(bot_id_str)
-
-        # 跳过当前机器人
-        if bot_id == current_bot_id:
-            continue
-
-        try:
-            # 检查这个机器人是否在目标群组中
-            group_list = await bot.get_group_list()
-            group_ids = [group["group_id"] for group in group_list]
-
-            if group_id in group_ids:
-                other_bot_priority = BOT_PRIORITY.get(bot_id, 0)
-                logger.info(
-                    f"发现机器人 {bot_id} 已在群 {group_id} 中，优先级: {other_bot_priority}"
-                )
-
-                # 比较优先级
-                if current_bot_priority > other_bot_priority:
-                    # 当前机器人优先级更高，让其他机器人退群
-                    logger.info(
-                        f"当前机器人 {current_bot_id} 优先级 {current_bot_priority} > 机器人 {bot_id} 优先级 {other_bot_priority}，让其退群"
-                    )
-                    try:
-                        await bot.set_group_leave(group_id=group_id)
-                        logger.info(f"成功让机器人 {bot_id} 退出群 {group_id}")
-                    except Exception as e:
-                        logger.warning(f"让机器人 {bot_id} 退出群 {group_id} 失败: {e}")
-                elif current_bot_priority < other_bot_priority:
-                    # 当前机器人优先级更低，拒绝进群
-                    return (
-                        False,
-                        f"群内已有更高优先级机器人 {bot_id} (优先级: {other_bot_priority})",
-                    )
-                else:
-                    # 优先级相同，拒绝进群
-                    return (
-                        False,
-                        f"群内已有相同优先级机器人 {bot_id} (优先级: {other_bot_priority})",
-                    )
+    # 从群组索引中查找已在群内的其他机器人
+    for bot_id in bot_group_index.bots_in(group_id) - {current_bot_id}:
+        other_bot_priority = BOT_PRIORITY.get(bot_id, 0)
+        logger.info(
+            f"发现机器人 {bot_id} 已在群 {group_id} 中，优先级: {other_bot_priority}"
+        )
 
-        except Exception as e:
-            logger.warning(f"检查机器人 {bot_id} 群组列表失败: {e}")
+        # 比较优先级
+        if current_bot_priority > other_bot_priority:
+            # 当前机器人优先级更高，让其他机器人退群
+            logger.info(
+                f"当前机器人 {current_bot_id} 优先级 {current_bot_priority} > 机器人 {bot_id} 优先级 {other_bot_priority}，让其退群"
+            )
+            if (bot := bots.get(str(bot_id))) is None:
+                logger.warning(f"机器人 {bot_id} 不在线，无法退出群 {group_id}")
+                continue
+            try:
+                await bot.set_group_leave(group_id=group_id)
+                await bot_group_index.remove(bot_id, group_id)
+                logger.info(f"成功让机器人 {bot_id} 退出群 {group_id}")
+            except Exception as e:
+                logger.warning(f"让机器人 {bot_id} 退出群 {group_id} 失败: {e}")
+        elif current_bot_priority < other_bot_priority:
+            # 当前机器人优先级更低，拒绝进群
+            return (
+                False,
+                f"群内已有更高优先级机器人 {bot_id} (优先级: {other_bot_priority})",
+            )
+        else:
+            # 优先级相同，拒绝进群
+            return (
+                False,
+                f"群内已有相同优先级机器人 {bot_id} (优先级: {other_bot_priority})",
+            )
 
     return True, "没有发现冲突的机器人"
 
@@ -1,3 +1,4 @@
+import asyncio
 import random
 
 from nonebot import get_driver, logger, on_command
@@ -15,7 +16,9 @@ from nonebot.plugin import PluginMetadata
 from nonebot_plugin_orm import get_session
 from sqlalchemy import delete, select
 
-from ..coin.api import subtract_coin
+from U1.outbound import PRIORITY_LOW, outbound
+
+from ..coin.api import subtract_coin, transaction
 from .models import cave_models
 from .tool import is_image_message
 
@@ -48,6 +51,20 @@ cave_update = on_command("更新回声洞", permission=SUPERUSER, block=True)
 SUPERUSER_list = list(get_driver().config.superusers)
 
 
+async def notify_superusers(bot: Bot, message: Message):
+    """通知所有超级用户，不等待发送结果，发送频率由 outbound 调度器限制"""
+
+    def log_failure(future: asyncio.Future):
+        if not future.cancelled() and (e := future.exception()) is not None:
+            logger.warning(f"回声洞通知超级用户失败: {e}")
+
+    for i in SUPERUSER_list:
+        future = await outbound.submit(
+            bot, "send_private_msg", PRIORITY_LOW, user_id=int(i), message=message
+        )
+        future.add_done_callback(log_failure)
+
+
 @cave_update.handle()
 async def _():
     "操作数据库，将id重新排列，并且自动id更新到最新"
@@ -144,31 +161,29 @@ async def _(bot: Bot, event: MessageEvent):
     if result[0] is False:  # 审核
         await cave_add.finish(result[1])
 
-    # 扣除次元币
+    # 扣除次元币与写入投稿在同一事务中提交
     user_id = str(event.user_id)
-    success, remaining_coin = await subtract_coin(user_id, 200)
-    if not success:
-        await cave_add.finish(
-            f"投稿需要消耗 200 次元币，您当前只有 {remaining_coin:.1f} 次元币，余额不足！"
+    async with transaction() as session:
+        success, remaining_coin = await subtract_coin(
+            user_id, 200, reason="投稿", source="cave", session=session
         )
+        if not success:
+            await cave_add.finish(
+                f"投稿需要消耗 200 次元币，您当前只有 {remaining_coin:.1f} 次元币，余额不足！"
+            )
 
-    async with get_session() as session:
         caves = cave_models(details=details, user_id=event.user_id)
         session.add(caves)
-        await session.commit()
-        await session.refresh(caves)
+        await session.flush()
 
         result = f"[投稿成功 #{caves.id}]\n"
         result += f"{caves.details}\n"
         result += "————————————\n"
         result += f"投稿时间: {caves.time.strftime('%Y-%m-%d %H:%M:%S')}\n"
         result += f"消耗次元币: 200 | 余额: {remaining_coin:.1f}"
-        for i in SUPERUSER_list:
-            await bot.send_private_msg(
-                user_id=int(i),
-                message=Message(f"来自用户{event.get_user_id()}\n{result}"),
-            )
-        await cave_add.finish(Message(f"{result}"))
+
+    await notify_superusers(bot, Message(f"来自用户{event.get_user_id()}\n{result}"))
+    await cave_add.finish(Message(f"{result}"))
 
 
 @cave_am_add.handle()
@@ -181,19 +196,20 @@ async def _(bot: Bot, event: MessageEvent):
     if result[0] is False:  # 审核
         await cave_am_add.finish(result[1])
 
-    # 扣除次元币
+    # 扣除次元币与写入投稿在同一事务中提交
     user_id = str(event.user_id)
-    success, remaining_coin = await subtract_coin(user_id, 400)
-    if not success:
-        await cave_am_add.finish(
-            f"匿名投稿需要消耗 400 次元币，您当前只有 {remaining_coin:.1f} 次元币，余额不足！"
+    async with transaction() as session:
+        success, remaining_coin = await subtract_coin(
+            user_id, 400, reason="匿名投稿", source="cave", session=session
         )
+        if not success:
+            await cave_am_add.finish(
+                f"匿名投稿需要消耗 400 次元币，您当前只有 {remaining_coin:.1f} 次元币，余额不足！"
+            )
 
-    async with get_session() as session:
         caves = cave_models(details=details, user_id=event.user_id, anonymous=True)
         session.add(caves)
-        await session.commit()
-        await session.refresh(caves)
+        await session.flush()
 
         result = f"[匿名投稿成功 #{caves.id}]\n"
         result += f"{caves.details}\n"
@@ -201,12 +217,9 @@ async def _(bot: Bot, event: MessageEvent):
         result += f"投稿时间: {caves.time.strftime('%Y-%m-%d %H:%M:%S')}\n"
         result += "匿名投稿会保存用户信息但其他用户无法看到作者\n"
         result += f"消耗次元币: 400 | 余额: {remaining_coin:.1f}"
-        for i in SUPERUSER_list:
-            await bot.send_private_msg(
-                user_id=int(i),
-                message=Message(f"来自用户{event.get_user_id()}\n{result}"),
-            )
-        await cave_am_add.finish(Message(f"{result}"))
+
+    await notify_superusers(bot, Message(f"来自用户{event.get_user_id()}\n{result}"))
+    await cave_am_add.finish(Message(f"{result}"))
 
 
 @cave_del.handle()
@@ -6,7 +6,7 @@ from nonebot import require
 require("nonebot_plugin_orm")
 
 from nonebot_plugin_orm import Model
-from sqlalchemy import BigInteger, Boolean, DateTime, Integer
+from sqlalchemy import BigInteger, Boolean, DateTime, Integer, Text
 from sqlalchemy.dialects.mysql import LONGTEXT
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -25,7 +25,7 @@ class cave_models(Model):
     __tablename__ = "cave_models"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True, autoincrement=True)
-    details: Mapped[str] = mapped_column(LONGTEXT)
+    details: Mapped[str] = mapped_column(Text().with_variant(LONGTEXT(), "mysql"))
     user_id: Mapped[int] = mapped_column(BigInteger)
     time: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
     anonymous: Mapped[bool] = mapped_column(Boolean, default=False)
@@ -1,11 +1,32 @@
-from nonebot import on_command
-from nonebot.adapters.onebot.v11 import MessageEvent
+from nonebot import get_driver, on_command, require
+from nonebot.adapters.onebot.v11 import Bot, GroupMessageEvent, MessageEvent
 from nonebot.params import CommandArg
+
+require("nonebot_plugin_apscheduler")
+
+from nonebot_plugin_apscheduler import scheduler
 from nonebot_plugin_orm import get_session
 from sqlalchemy import select
 
+from ..group_member import member_cache
+from .api import top_n
+from .config import config
+from .ledger import ledger, take_snapshots
 from .models import CoinRecord
 
+driver = get_driver()
+driver.on_startup(ledger.start)
+driver.on_shutdown(ledger.stop)
+
+scheduler.add_job(
+    take_snapshots,
+    "cron",
+    hour=config.coin_snapshot_hour,
+    id="coin_snapshot",
+    replace_existing=True,
+    misfire_grace_time=3600,
+)
+
 coin = on_command("coin", aliases={"金币", "余额"}, priority=5)
 
 
@@ -23,3 +44,36 @@ async def handle_coin(event: MessageEvent, args=CommandArg()):
             )
         else:
             await coin.finish("你还没有金币记录。")
+
+
+coin_rank = on_command("金币排行", aliases={"coinrank"}, priority=5)
+RANK_PAGE_SIZE = 10
+
+
+@coin_rank.handle()
+async def handle_coin_rank(bot: Bot, event: MessageEvent, args=CommandArg()):
+    """金币排行 [历史] [页码]"""
+    text = args.extract_plain_text()
+    by = "count_coin" if "历史" in text else "coin"
+    digits = "".join(ch for ch in text if ch.isdigit())
+    page = max(int(digits), 1) if digits else 1
+
+    ranking = await top_n(by, RANK_PAGE_SIZE, (page - 1) * RANK_PAGE_SIZE)
+    if not ranking:
+        await coin_rank.finish("这一页还没有人上榜哦~")
+
+    # 排行榜用户多半不在本群，只查缓存的成员列表，不在列表中的直接显示 QQ 号
+    names: dict[int, str] = {}
+    if isinstance(event, GroupMessageEvent):
+        names = {
+            member.user_id: member.name
+            for member in member_cache.peek(bot.self_id, event.group_id) or ()
+        }
+
+    title = "历史总金币" if by == "count_coin" else "金币"
+    lines = [f"{title}排行（第 {page} 页）"]
+    for rank, (user_id, value) in enumerate(
+        ranking, start=(page - 1) * RANK_PAGE_SIZE + 1
+    ):
+        lines.append(f"{rank}. {names.get(int(user_id), user_id)}：{value:.1f}")
+    await coin_rank.finish("\n".join(lines))
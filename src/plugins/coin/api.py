@@ -1,94 +1,306 @@
+from collections.abc import AsyncIterator, Iterable, Mapping
+from contextlib import asynccontextmanager
+from typing import Literal
+
 from nonebot_plugin_orm import get_session
-from sqlalchemy import select
+from sqlalchemy import Insert, event, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from U1.database import upsert
 
+from .ledger import ledger
 from .models import CoinRecord
 
 
-async def get_coin(user_id: str) -> float:
+@asynccontextmanager
+async def transaction() -> AsyncIterator[AsyncSession]:
+    """
+    开启一个跨插件共用的会话，正常退出时统一提交一次，出现异常时回滚
+
+    在其中调用金币接口时传入 `session=`，金币变动与业务数据在同一事务中提交；
+    金币流水在提交成功后才会写入缓冲区。
+    """
     async with get_session() as session:
-        result = await session.execute(
-            select(CoinRecord).where(CoinRecord.user_id == user_id)
+        yield session
+        await session.commit()
+
+
+@asynccontextmanager
+async def _use_session(session: AsyncSession | None) -> AsyncIterator[AsyncSession]:
+    """传入会话时直接使用（由调用方提交），否则新开会话并在结束时提交"""
+    if session is not None:
+        yield session
+        return
+    async with transaction() as session:
+        yield session
+
+
+def _record(
+    session: AsyncSession,
+    user_id: str,
+    delta: float,
+    balance: float,
+    reason: str,
+    source: str,
+):
+    """记录一条待写入的金币流水，会话提交后才进入缓冲区，回滚则丢弃"""
+    pending: list[tuple] | None = session.info.get("coin_ledger")
+    if pending is None:
+        pending = session.info["coin_ledger"] = []
+
+        @event.listens_for(session.sync_session, "after_commit")
+        def _(_):
+            for entry in pending:
+                ledger.append(*entry)
+            pending.clear()
+
+        @event.listens_for(session.sync_session, "after_rollback")
+        def _(_):
+            pending.clear()
+
+    pending.append((user_id, delta, balance, reason, source))
+
+
+# 批量写入时每条语句包含的最大行数
+BULK_CHUNK_SIZE = 500
+
+
+def _upsert(session: AsyncSession, values: dict | list[dict], **on_conflict) -> Insert:
+    """
+    按 user_id 唯一索引构造 INSERT ... ON CONFLICT / ON DUPLICATE KEY UPDATE
+
+    `on_conflict` 的值为接收「待插入行」列集合的函数，返回冲突时该列的新值
+    """
+    return upsert(session, CoinRecord, values, ["user_id"], **on_conflict)
+
+
+async def _execute_returning_coin(
+    session: AsyncSession, stmt, user_id: str
+) -> float | None:
+    """执行写入语句并取回该用户的最新余额，支持 RETURNING 时只需一次往返"""
+    dialect = session.get_bind(CoinRecord).dialect
+    returning = (
+        dialect.insert_returning
+        if isinstance(stmt, Insert)
+        else dialect.update_returning
+    )
+    if returning:
+        result = await session.execute(stmt.returning(CoinRecord.coin))
+        return result.scalar_one_or_none()
+
+    result = await session.execute(stmt)
+    # SQLAlchemy 的 MySQL 方言默认开启 FOUND_ROWS，rowcount 为匹配行数而非修改行数
+    if not isinstance(stmt, Insert) and result.rowcount == 0:
+        return None
+    return await session.scalar(
+        select(CoinRecord.coin).where(CoinRecord.user_id == user_id)
+    )
+
+
+async def get_coin(user_id: str, *, session: AsyncSession | None = None) -> float:
+    async with _use_session(session) as session:
+        coin = await session.scalar(
+            select(CoinRecord.coin).where(CoinRecord.user_id == user_id)
         )
-        record = result.scalar_one_or_none()
-        return record.coin if record else 0.0
+        return coin if coin is not None else 0.0
 
 
-async def get_count_coin(user_id: str) -> float:
-    async with get_session() as session:
-        result = await session.execute(
-            select(CoinRecord).where(CoinRecord.user_id == user_id)
+async def get_count_coin(user_id: str, *, session: AsyncSession | None = None) -> float:
+    async with _use_session(session) as session:
+        count_coin = await session.scalar(
+            select(CoinRecord.count_coin).where(CoinRecord.user_id == user_id)
         )
-        record = result.scalar_one_or_none()
-        return record.count_coin if record else 0.0
+        return count_coin if count_coin is not None else 0.0
 
 
-async def add_coin(user_id: str, amount: float) -> float:
-    """增加金币，返回剩余金币数量"""
-    async with get_session() as session:
-        result = await session.execute(
-            select(CoinRecord).where(CoinRecord.user_id == user_id)
+async def get_coins_bulk(
+    user_ids: Iterable[str], *, session: AsyncSession | None = None
+) -> dict[str, float]:
+    """批量查询金币，没有记录的用户为 0"""
+    user_ids = list(dict.fromkeys(user_ids))
+    coins = dict.fromkeys(user_ids, 0.0)
+    async with _use_session(session) as session:
+        for i in range(0, len(user_ids), BULK_CHUNK_SIZE):
+            result = await session.execute(
+                select(CoinRecord.user_id, CoinRecord.coin).where(
+                    CoinRecord.user_id.in_(user_ids[i : i + BULK_CHUNK_SIZE])
+                )
+            )
+            coins.update(result.tuples())
+    return coins
+
+
+async def add_coin(
+    user_id: str,
+    amount: float,
+    *,
+    reason: str = "",
+    source: str = "",
+    session: AsyncSession | None = None,
+) -> float:
+    """
+    增加金币，返回剩余金币数量
+
+    `reason`、`source`（来源插件）会写入金币流水；
+    传入 `session` 时不会提交，由调用方（通常是 `transaction()`）统一提交
+    """
+    async with _use_session(session) as session:
+        stmt = _upsert(
+            session,
+            {"user_id": user_id, "coin": amount, "count_coin": amount},
+            coin=lambda new: CoinRecord.coin + new.coin,
+            count_coin=lambda new: CoinRecord.count_coin + new.count_coin,
         )
-        record = result.scalar_one_or_none()
-        if record:
-            record.coin += amount
-            record.count_coin += amount
-        else:
-            record = CoinRecord(user_id=user_id, coin=amount, count_coin=amount)
-            session.add(record)
-        await session.commit()
-        await session.refresh(record)
-        return record.coin
+        coin = await _execute_returning_coin(session, stmt, user_id) or 0.0
+        _record(session, user_id, amount, coin, reason, source)
+        return coin
+
+
+async def add_coins_bulk(
+    mapping: Mapping[str, float],
+    *,
+    reason: str = "",
+    source: str = "",
+    session: AsyncSession | None = None,
+) -> dict[str, float]:
+    """
+    批量增加金币（多行 upsert），返回每个用户的剩余金币数量
+
+    适用于活动奖励等一次发放给大量用户的场景
+    """
+    items = [(user_id, amount) for user_id, amount in mapping.items()]
+    balances: dict[str, float] = {}
+    async with _use_session(session) as session:
+        returning = session.get_bind(CoinRecord).dialect.insert_returning
+        for i in range(0, len(items), BULK_CHUNK_SIZE):
+            chunk = items[i : i + BULK_CHUNK_SIZE]
+            stmt = _upsert(
+                session,
+                [
+                    {"user_id": user_id, "coin": amount, "count_coin": amount}
+                    for user_id, amount in chunk
+                ],
+                coin=lambda new: CoinRecord.coin + new.coin,
+                count_coin=lambda new: CoinRecord.count_coin + new.count_coin,
+            )
+            if returning:
+                result = await session.execute(
+                    stmt.returning(CoinRecord.user_id, CoinRecord.coin)
+                )
+                balances.update(result.tuples())
+            else:
+                await session.execute(stmt)
+                balances.update(
+                    await get_coins_bulk(
+                        (user_id for user_id, _ in chunk), session=session
+                    )
+                )
+
+        for user_id, amount in items:
+            _record(session, user_id, amount, balances[user_id], reason, source)
+    return balances
 
 
-async def set_coin(user_id: str, amount: float) -> float:
+async def set_coin(
+    user_id: str,
+    amount: float,
+    *,
+    reason: str = "",
+    source: str = "",
+    session: AsyncSession | None = None,
+) -> float:
     """设置金币数量，返回设置后的金币数量"""
-    async with get_session() as session:
-        result = await session.execute(
-            select(CoinRecord).where(CoinRecord.user_id == user_id)
+    async with _use_session(session) as session:
+        # 先确保记录存在（已存在时不修改），再锁定该行读取旧余额，
+        # 避免读取与写入之间被并发增减导致流水差值错误
+        await session.execute(
+            _upsert(
+                session,
+                {"user_id": user_id, "coin": 0.0, "count_coin": amount},
+                coin=lambda _: CoinRecord.coin,
+            )
         )
-        record = result.scalar_one_or_none()
-        if record:
-            record.coin = amount
-        else:
-            record = CoinRecord(user_id=user_id, coin=amount, count_coin=amount)
-            session.add(record)
-        await session.commit()
-        await session.refresh(record)
-        return record.coin
+        old_coin = await session.scalar(
+            select(CoinRecord.coin)
+            .where(CoinRecord.user_id == user_id)
+            .with_for_update()
+        )
+        await session.execute(
+            update(CoinRecord).where(CoinRecord.user_id == user_id).values(coin=amount)
+        )
+        _record(session, user_id, amount - (old_coin or 0.0), amount, reason, source)
+        return amount
 
 
-async def subtract_coin(user_id: str, amount: float) -> tuple[bool, float]:
+async def subtract_coin(
+    user_id: str,
+    amount: float,
+    *,
+    reason: str = "",
+    source: str = "",
+    session: AsyncSession | None = None,
+) -> tuple[bool, float]:
     """
     减少金币，返回操作是否成功和剩余金币数量
 
     Args:
         user_id: 用户ID
         amount: 要减少的金币数量
+        reason: 流水备注
+        source: 来源插件
+        session: 共用的会话，传入时由调用方提交
 
     Returns:
         tuple[bool, float]: (是否成功, 剩余金币数量)
         如果余额不足，返回 (False, 当前余额)
         如果成功扣除，返回 (True, 剩余余额)
     """
-    async with get_session() as session:
-        result = await session.execute(
-            select(CoinRecord).where(CoinRecord.user_id == user_id)
+    async with _use_session(session) as session:
+        if not amount:
+            # 扣除 0 不修改任何行，不依赖驱动对 rowcount 的统计方式
+            current_coin = await session.scalar(
+                select(CoinRecord.coin).where(CoinRecord.user_id == user_id)
+            )
+            if current_coin is None or current_coin < 0:
+                return False, current_coin or 0.0
+            return True, current_coin
+
+        # 余额检查与扣除在同一条语句中完成，并发扣款不会扣成负数
+        stmt = (
+            update(CoinRecord)
+            .where(CoinRecord.user_id == user_id, CoinRecord.coin >= amount)
+            .values(coin=CoinRecord.coin - amount)
         )
-        record = result.scalar_one_or_none()
+        coin = await _execute_returning_coin(session, stmt, user_id)
+        if coin is None:
+            # 用户不存在或余额不足
+            current_coin = await session.scalar(
+                select(CoinRecord.coin).where(CoinRecord.user_id == user_id)
+            )
+            return False, current_coin or 0.0
 
-        # 如果用户不存在或余额不足
-        current_coin = record.coin if record else 0.0
-        if current_coin < amount:
-            return False, current_coin
+        _record(session, user_id, -amount, coin, reason, source)
+        return True, coin
 
-        # 扣除金币
-        if record:
-            record.coin -= amount
-        else:
-            # 理论上不会执行到这里，因为上面已经检查了余额
-            record = CoinRecord(user_id=user_id, coin=-amount, count_coin=0)
-            session.add(record)
 
-        await session.commit()
-        await session.refresh(record)
-        return True, record.coin
+async def top_n(
+    by: Literal["coin", "count_coin"] = "coin",
+    n: int = 10,
+    offset: int = 0,
+    *,
+    session: AsyncSession | None = None,
+) -> list[tuple[str, float]]:
+    """
+    金币排行，按 `by` 列的索引倒序读取
+
+    :返回: `[(user_id, 数值), ...]`
+    """
+    column = CoinRecord.coin if by == "coin" else CoinRecord.count_coin
+    async with _use_session(session) as session:
+        result = await session.execute(
+            select(CoinRecord.user_id, column)
+            .order_by(column.desc())
+            .limit(n)
+            .offset(offset)
+        )
+        return list(result.tuples())
@@ -0,0 +1,12 @@
+from nonebot import get_plugin_config
+from pydantic import BaseModel
+
+
+class Config(BaseModel):
+    coin_ledger_flush_interval: int = 500  # 金币流水批量写入间隔 (ms)
+    coin_ledger_flush_size: int = 500  # 缓冲条数达到该值时立即写入
+    coin_ledger_buffer_limit: int = 50000  # 数据库不可用时最多缓冲的条数
+    coin_snapshot_hour: int = 4  # 每日生成余额快照的时间 (时)
+
+
+config = get_plugin_config(Config)
@@ -0,0 +1,165 @@
+"""金币流水：进程内缓冲后批量写入，定期汇总为余额快照"""
+
+import asyncio
+from contextlib import suppress
+from datetime import datetime
+
+from nonebot import logger
+from nonebot_plugin_orm import get_session
+from sqlalchemy import func, insert, select
+
+from .config import config
+from .models import CoinLedger, CoinRecord, CoinSnapshot
+
+
+class LedgerBuffer:
+    """
+    金币流水缓冲区
+
+    金币变动只追加到内存列表，由后台任务每 `interval` 秒批量写入一次；
+    缓冲条数达到 `max_size` 时提前写入。写入失败的流水会放回缓冲区等待重试，
+    超过 `limit` 条时丢弃最早的流水（只影响流水，账户余额不受影响）。
+    """
+
+    def __init__(self, interval: float, max_size: int, limit: int):
+        self.interval = interval
+        self.max_size = max_size
+        self.limit = limit
+        self.dropped = 0  # 累计丢弃的流水条数
+        self._rows: list[dict] = []
+        self._lock = asyncio.Lock()
+        self._task: asyncio.Task | None = None
+        self._flush_task: asyncio.Task | None = None
+
+    def append(
+        self, user_id: str, delta: float, balance: float, reason: str, source: str
+    ):
+        self._rows.append(
+            {
+                "user_id": user_id,
+                "delta": delta,
+                "balance": balance,
+                "reason": reason,
+                "source": source,
+                "created_at": datetime.now(),
+            }
+        )
+        self._trim()
+        if len(self._rows) >= self.max_size and (
+            self._flush_task is None or self._flush_task.done()
+        ):
+            self._flush_task = asyncio.create_task(self.flush())
+
+    async def flush(self):
+        async with self._lock:
+            if not self._rows:
+                return
+            rows, self._rows = self._rows, []
+            try:
+                async with get_session() as session:
+                    await session.execute(insert(CoinLedger), rows)
+                    await session.commit()
+            except Exception:
+                self._rows[:0] = rows
+                self._trim()
+                logger.exception(
+                    f"金币流水写入失败，{len(self._rows)} 条记录将稍后重试"
+                    f"（缓冲区已满累计丢弃 {self.dropped} 条）"
+                )
+
+    def _trim(self):
+        """缓冲超过上限时丢弃最早的流水，数据库恢复前每次写入失败都会汇报累计数"""
+        if (overflow := len(self._rows) - self.limit) > 0:
+            del self._rows[:overflow]
+            self.dropped += overflow
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    async def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            with suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        await self.flush()
+
+
+async def take_snapshots() -> int:
+    """
+    将上次快照之后的流水汇总为余额快照，并与 `CoinRecord` 对账
+
+    只读取 id 大于上次快照的流水，返回生成的快照数量
+    """
+    await ledger.flush()
+    async with get_session() as session:
+        last_ledger_id = (
+            await session.scalar(select(func.max(CoinSnapshot.ledger_id))) or 0
+        )
+        latest = (
+            select(
+                CoinLedger.user_id,
+                func.max(CoinLedger.id).label("ledger_id"),
+            )
+            .where(CoinLedger.id > last_ledger_id)
+            .group_by(CoinLedger.user_id)
+            .subquery()
+        )
+        rows = (
+            await session.execute(
+                select(
+                    latest.c.user_id,
+                    latest.c.ledger_id,
+                    CoinLedger.balance,
+                    CoinRecord.coin,
+                    CoinRecord.count_coin,
+                )
+                .join(CoinLedger, CoinLedger.id == latest.c.ledger_id)
+                .join(CoinRecord, CoinRecord.user_id == latest.c.user_id)
+            )
+        ).all()
+
+        mismatched = 0
+        for user_id, ledger_id, balance, coin, count_coin in rows:
+            # 快照生成期间仍有金币变动时可能短暂不一致
+            if abs(balance - coin) > 1e-6:
+                mismatched += 1
+                logger.warning(
+                    f"金币对账不一致: 用户 {user_id} 流水余额 {balance}，账户余额 {coin}"
+                )
+        session.add_all(
+            CoinSnapshot(
+                user_id=user_id, coin=coin, count_coin=count_coin, ledger_id=ledger_id
+            )
+            for user_id, ledger_id, _, coin, count_coin in rows
+        )
+        await session.commit()
+
+    logger.info(f"金币快照已生成 {len(rows)} 条，对账不一致 {mismatched} 条")
+    return len(rows)
+
+
+async def get_ledger(
+    user_id: str, since: datetime | None = None, limit: int = 20
+) -> list[CoinLedger]:
+    """按时间倒序获取用户的金币流水"""
+    await ledger.flush()
+    stmt = select(CoinLedger).where(CoinLedger.user_id == user_id)
+    if since is not None:
+        stmt = stmt.where(CoinLedger.created_at >= since)
+    stmt = stmt.order_by(CoinLedger.created_at.desc()).limit(limit)
+    async with get_session() as session:
+        return list((await session.scalars(stmt)).all())
+
+
+ledger = LedgerBuffer(
+    config.coin_ledger_flush_interval / 1000,
+    config.coin_ledger_flush_size,
+    config.coin_ledger_buffer_limit,
+)
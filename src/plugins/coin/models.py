@@ -1,12 +1,53 @@
+from datetime import datetime
+
 from nonebot_plugin_orm import Model
-from sqlalchemy import Float, Integer, String
+from sqlalchemy import BigInteger, DateTime, Float, Index, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column
 
+# SQLite 只有 INTEGER PRIMARY KEY 会自增
+LedgerId = BigInteger().with_variant(Integer(), "sqlite")
+
 
 class CoinRecord(Model):
     __tablename__ = "coin_coinrecord"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[str] = mapped_column(String(32), unique=True, index=True)
+    # 排行榜按索引倒序读取
+    coin: Mapped[float] = mapped_column(Float, default=0, index=True)
+    count_coin: Mapped[float] = mapped_column(Float, default=0, index=True)
+
+
+class CoinLedger(Model):
+    """金币流水表 - 只追加，每次金币变动一条"""
+
+    __tablename__ = "coin_ledger"
+
+    id: Mapped[int] = mapped_column(LedgerId, primary_key=True, autoincrement=True)
     user_id: Mapped[str] = mapped_column(String(32))
-    coin: Mapped[float] = mapped_column(Float, default=0)
-    count_coin: Mapped[float] = mapped_column(Float, default=0)
+    delta: Mapped[float] = mapped_column(Float)
+    balance: Mapped[float] = mapped_column(Float)  # 变动后的余额
+    reason: Mapped[str] = mapped_column(String(64), default="")
+    source: Mapped[str] = mapped_column(String(32), default="")  # 来源插件
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
+
+    __table_args__ = (
+        Index("ix_coin_ledger_user_time", "user_id", "created_at"),
+        Index("ix_coin_ledger_created_at", "created_at"),
+    )
+
+
+class CoinSnapshot(Model):
+    """余额快照表 - 由流水定期汇总生成，用于对账"""
+
+    __tablename__ = "coin_snapshot"
+
+    id: Mapped[int] = mapped_column(LedgerId, primary_key=True, autoincrement=True)
+    user_id: Mapped[str] = mapped_column(String(32))
+    coin: Mapped[float] = mapped_column(Float)
+    count_coin: Mapped[float] = mapped_column(Float)
+    # 快照包含的最后一条流水
+    ledger_id: Mapped[int] = mapped_column(BigInteger, index=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now)
+
+    __table_args__ = (Index("ix_coin_snapshot_user_ledger", "user_id", "ledger_id"),)
@@ -11,6 +11,8 @@ from nonebot_plugin_apscheduler import scheduler
 from nonebot_plugin_htmlrender import html_to_pic
 from nonebot_plugin_localstore import get_cache_dir
 
+from U1.utils.request import get_client
+
 from .config import ddcheck_config
 
 HEADERS = {
@@ -48,25 +50,22 @@ async def update_vtb_list():
         "https://hkapi.vtbs.moe/v1/short",
         "https://kr.vtbs.moe/v1/short",
     ]
-    async with httpx.AsyncClient() as client:
-        for url in urls:
-            try:
-                resp = await client.get(url, timeout=20)
-                result = resp.json()
-                if not result:
-                    continue
-                for info in result:
-                    if info.get("uid", None) and info.get("uname", None):
-                        vtb_list.append(
-                            {"mid": int(info["uid"]), "uname": info["uname"]}
-                        )
-                    if info.get("mid", None) and info.get("uname", None):
-                        vtb_list.append(info)
-                break
-            except httpx.TimeoutException:
-                logger.warning(f"Get {url} timeout")
-            except Exception:
-                logger.exception(f"Error when getting {url}, ignore")
+    for url in urls:
+        try:
+            resp = await get_client(url).get(url, timeout=20)
+            result = resp.json()
+            if not result:
+                continue
+            for info in result:
+                if info.get("uid", None) and info.get("uname", None):
+                    vtb_list.append({"mid": int(info["uid"]), "uname": info["uname"]})
+                if info.get("mid", None) and info.get("uname", None):
+                    vtb_list.append(info)
+            break
+        except httpx.TimeoutException:
+            logger.warning(f"Get {url} timeout")
+        except Exception:
+            logger.exception(f"Error when getting {url}, ignore")
     dump_vtb_list(vtb_list)
 
 
@@ -110,13 +109,12 @@ async def get_vtb_list() -> list[dict]:
     return load_vtb_list()
 
 
-async def get_homepage_cookies(client: httpx.AsyncClient) -> dict[str, str]:
+async def get_homepage_cookies() -> dict[str, str]:
     """获取B站首页Cookies"""
     if not homepage_cookies:
+        url = "https://data.bilibili.com/v/"
         headers = {"User-Agent": HEADERS["User-Agent"]}
-        resp = await client.get(
-            "https://data.bilibili.com/v/", headers=headers, follow_redirects=True
-        )
+        resp = await get_client(url).get(url, headers=headers, follow_redirects=True)
         homepage_cookies.update(resp.cookies)
     return homepage_cookies
 
@@ -125,34 +123,36 @@ async def get_uid_by_name(name: str) -> int | None:
     """通过用户名获取UID"""
     url = "https://api.bilibili.com/x/web-interface/wbi/search/type"
     params = {"search_type": "bili_user", "keyword": name}
-    async with httpx.AsyncClient(timeout=10) as client:
-        cookies.update(await get_homepage_cookies(client))
-        resp = await client.get(url, params=params, headers=HEADERS, cookies=cookies)
-        cookies.update(resp.cookies)
-        result = resp.json()
-        logger.info(f"get_uid_by_name: {result}")
-        for user in result["data"]["result"]:
-            if user["uname"] == name:
-                return user["mid"]
+    cookies.update(await get_homepage_cookies())
+    resp = await get_client(url).get(
+        url, params=params, headers=HEADERS, cookies=cookies, timeout=10
+    )
+    cookies.update(resp.cookies)
+    result = resp.json()
+    logger.info(f"get_uid_by_name: {result}")
+    for user in result["data"]["result"]:
+        if user["uname"] == name:
+            return user["mid"]
 
 
 async def get_medal_list(uid: int) -> list[dict]:
     """获取用户勋章列表"""
     url = "https://api.live.bilibili.com/xlive/web-ucenter/user/MedalWall"
     params = {"target_id": uid}
-    async with httpx.AsyncClient(timeout=10) as client:
-        cookies.update(await get_homepage_cookies(client))
-        resp = await client.get(url, params=params, headers=HEADERS, cookies=cookies)
-        cookies.update(resp.cookies)
-        result = resp.json()
+    cookies.update(await get_homepage_cookies())
+    resp = await get_client(url).get(
+        url, params=params, headers=HEADERS, cookies=cookies, timeout=10
+    )
+    cookies.update(resp.cookies)
+    result = resp.json()
 
-        if "data" not in result:
-            raise KeyError(f"API响应中缺少 'data' 字段: {result}")
+    if "data" not in result:
+        raise KeyError(f"API响应中缺少 'data' 字段: {result}")
 
-        if "list" not in result["data"]:
-            return []
+    if "list" not in result["data"]:
+        return []
 
-        return result["data"]["list"]
+    return result["data"]["list"]
 
 
 # 优化后的API配置，基于测试结果重新排序
@@ -176,9 +176,8 @@ PAGE_SIZE = 50
 
 async def get_api_data(url: str, params: dict) -> dict:
     """通用API请求函数"""
-    async with httpx.AsyncClient(timeout=10) as client:
-        resp = await client.get(url, params=params, headers=HEADERS)
-        return resp.json()
+    resp = await get_client(url).get(url, params=params, headers=HEADERS, timeout=10)
+    return resp.json()
 
 
 async def fetch_all_followings(uid: int, api_config: dict) -> list[int]:
@@ -1,4 +1,3 @@
-import asyncio
 import random
 
 from nonebot import get_driver, on_command, on_fullmatch
@@ -18,6 +17,8 @@ from nonebot.params import CommandArg
 from nonebot.permission import SUPERUSER
 from nonebot.plugin import PluginMetadata
 
+from U1.outbound import delayed
+
 from .config import Config, config
 from .data_source import (
     choice,
@@ -62,8 +63,17 @@ update_def = on_fullmatch("update", permission=SUPERUSER, block=True)
 @update_def.handle()
 async def _update(event: Event):
     """更新"""
-    await update_sql()
-    await update_def.finish("更新成功！")
+    reported = 0
+
+    async def on_progress(done: int, total: int):
+        # 每完成四分之一汇报一次
+        nonlocal reported
+        if done < total and done * 4 // total > reported:
+            reported = done * 4 // total
+            await update_def.send(f"更新中… {done}/{total}")
+
+    deleted, renamed = await update_sql(on_progress)
+    await update_def.finish(f"更新成功！删除 {deleted} 条，重命名 {renamed} 条")
 
 
 @fishing.handle(
@@ -100,8 +110,9 @@ async def _fishing(event: GroupMessageEvent | PrivateMessageEvent, bot: Bot):
     else:
         result = f"* 你钓到了一条 {get_quality(fish_name)} {fish_name}，长度为 {fish_long}cm！"
     await save_fish(user_id, fish_name, fish_long)
-    await asyncio.sleep(sleep_time)
-    await fishing.finish(result, reply_message=True)
+    # 悬念延迟交给时间轮，处理器立即返回
+    delayed.reply_later(bot, event, result, sleep_time, reply_message=True)
+    await fishing.finish()
 
 
 @stats.handle()
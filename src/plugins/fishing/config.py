@@ -171,5 +171,17 @@ class Config(BaseModel):
     fishing_limit: int = 15  # 钓鱼间隔 (s)
     fishing_coin_name: str = "次元币"  # 货币名称
 
+    # update 指令从背包中删除的鱼
+    fishing_delete_fish: list[str] = [
+        "贴图错误鱼发霉的鲤鱼",
+        "多宝鱼龙利鱼墨鱼",
+        "腐烂的孙笑川鱼",
+        "虚空乌贼虚空鳗鱼",
+        "黄花鱼墨鱼",
+    ]
+    # update 指令重命名的鱼 {旧名: 新名}，同一用户的新旧鱼会合并
+    fishing_rename_fish: dict[str, str] = {}
+    fishing_update_chunk_size: int = 500  # update 指令每批处理的用户数
+
 
 config = get_plugin_config(Config)
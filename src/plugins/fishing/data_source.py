@@ -1,15 +1,25 @@
 import random
 import time
+from collections.abc import Awaitable, Callable, Mapping
+from functools import cache
+from itertools import accumulate
+from types import MappingProxyType
+from typing import NamedTuple
 
 import ujson as json
+from nonebot import logger
 from nonebot.adapters.onebot.v11 import GroupMessageEvent, PrivateMessageEvent
+from nonebot_plugin_localstore import get_data_file
 from nonebot_plugin_orm import get_session
-from sqlalchemy import select, update
+from sqlalchemy import Insert, case, delete, distinct, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..coin.api import add_coin, get_coin, get_count_coin
+from U1.database import upsert
+
+from ..coin.api import add_coin, get_coin, get_count_coin, transaction
 from ..today_yunshi.data_source import get_user_luck_star
 from .config import config
-from .models import FishingRecord, FishingSwitch
+from .models import FishingInventory, FishingRecord, FishingSwitch
 
 fishing_coin_name = config.fishing_coin_name
 fish_rotten = config.fish_rotten
@@ -20,51 +30,132 @@ fish_void = config.fish_void
 fish_fire = config.fish_hidden_fire
 
 
-async def update_sql():
-    delete_fish = [
-        "贴图错误鱼发霉的鲤鱼",
-        "多宝鱼龙利鱼墨鱼",
-        "腐烂的孙笑川鱼",
-        "虚空乌贼虚空鳗鱼",
-        "黄花鱼墨鱼",
-    ]
+# update 指令的进度文件，中断后再次执行会从记录的位置继续
+update_progress_file = get_data_file("fishing", "update_sql.json")
+
+
+async def update_sql(
+    on_progress: Callable[[int, int], Awaitable[None]] | None = None,
+) -> tuple[int, int]:
+    """
+    按配置删除、重命名背包中的鱼
+
+    按 user_id 分批处理，每批一个事务：删除与重命名来源行合并为一条 DELETE，
+    重命名后的库存合并为一条多行 upsert。每批提交后记录进度，
+    中断后再次执行会从上次的位置继续（配置变化时从头开始）。
+
+    :参数:
+      * `on_progress`: 每批完成后调用，参数为（已处理用户数, 用户总数）
+
+    :返回: （删除的库存行数, 重命名的库存行数）
+    """
+    delete_fish = config.fishing_delete_fish
+    # 新名字也在删除列表里时直接删除
+    rename_fish = {
+        old: new
+        for old, new in config.fishing_rename_fish.items()
+        if new not in delete_fish
+    }
+    removed_names = list({*delete_fish, *config.fishing_rename_fish})
+    signature = json.dumps([sorted(delete_fish), sorted(rename_fish.items())])
+
+    last_user_id = ""
+    if update_progress_file.exists():
+        progress = json.loads(update_progress_file.read_text(encoding="utf-8"))
+        if progress.get("signature") == signature:
+            last_user_id = progress["last_user_id"]
+            logger.info(f"钓鱼数据更新: 从用户 {last_user_id} 之后继续")
 
     async with get_session() as session:
-        stmt = select(FishingRecord)
-        result = await session.execute(stmt)
-        fishes_records = result.scalars().all()
-
-        update_data = []
-
-        for fishes_record in fishes_records:
-            load_fishes = json.loads(fishes_record.fishes)
-            fish_removed = False
-
-            for fish_name in delete_fish:
-                if fish_name in load_fishes:
-                    del load_fishes[fish_name]
-                    fish_removed = True
-
-            # 只保留鱼的处理逻辑，移除 coin/count_coin 相关逻辑
-            if fish_removed:
-                dump_fishes = json.dumps(load_fishes)
-                update_data.append(
-                    {
-                        "user_id": fishes_record.user_id,
-                        "fishes": dump_fishes,
-                    }
+        total = await session.scalar(
+            select(func.count(distinct(FishingInventory.user_id))).where(
+                FishingInventory.user_id > last_user_id
+            )
+        )
+    done = deleted = renamed = 0
+
+    while True:
+        async with get_session() as session:
+            user_ids = list(
+                await session.scalars(
+                    select(FishingInventory.user_id)
+                    .distinct()
+                    .where(FishingInventory.user_id > last_user_id)
+                    .order_by(FishingInventory.user_id)
+                    .limit(config.fishing_update_chunk_size)
                 )
-
-        if update_data:
-            for data in update_data:
-                stmt = (
-                    update(FishingRecord)
-                    .where(FishingRecord.user_id == data["user_id"])
-                    .values(fishes=data["fishes"])
+            )
+            if not user_ids:
+                break
+
+            # 同一用户的多个旧名字可能改成同一个新名字，先在内存中合并
+            merged: dict[tuple[str, str], list[int]] = {}
+            renamed_rows = 0
+            if rename_fish:
+                rows = await session.execute(
+                    select(
+                        FishingInventory.user_id,
+                        FishingInventory.fish_name,
+                        FishingInventory.count,
+                        FishingInventory.total_length,
+                        FishingInventory.max_length,
+                    ).where(
+                        FishingInventory.user_id.in_(user_ids),
+                        FishingInventory.fish_name.in_(list(rename_fish)),
+                    )
+                )
+                for user_id, fish_name, count, total_length, max_length in rows:
+                    renamed_rows += 1
+                    item = merged.setdefault(
+                        (user_id, rename_fish[fish_name]), [0, 0, 0]
+                    )
+                    item[0] += count
+                    item[1] += total_length
+                    item[2] = max(item[2], max_length)
+
+            result = await session.execute(
+                delete(FishingInventory).where(
+                    FishingInventory.user_id.in_(user_ids),
+                    FishingInventory.fish_name.in_(removed_names),
+                )
+            )
+            if merged:
+                await session.execute(
+                    _upsert_inventory(
+                        session,
+                        [
+                            {
+                                "user_id": user_id,
+                                "fish_name": fish_name,
+                                "count": count,
+                                "total_length": total_length,
+                                "max_length": max_length,
+                            }
+                            for (user_id, fish_name), (
+                                count,
+                                total_length,
+                                max_length,
+                            ) in merged.items()
+                        ],
+                    )
                 )
-                await session.execute(stmt)
             await session.commit()
 
+        renamed += renamed_rows
+        deleted += result.rowcount - renamed_rows
+        done += len(user_ids)
+        last_user_id = user_ids[-1]
+        update_progress_file.write_text(
+            json.dumps({"signature": signature, "last_user_id": last_user_id}),
+            encoding="utf-8",
+        )
+        logger.info(f"钓鱼数据更新: {done}/{total} 个用户")
+        if on_progress is not None:
+            await on_progress(done, total)
+
+    update_progress_file.unlink(missing_ok=True)
+    return deleted, renamed
+
 
 # 定义鱼的不同质量及其属性
 fish = {
@@ -93,37 +184,45 @@ def calculate_weight_increase(luck_star_num: int) -> float:
 MAX_WEIGHT_INCREASE = 30  # 设置权重增加上限
 
 
-async def get_weight(
-    user_id: str, fish_quality: list[str]
-) -> tuple[list[int], bool, int | None]:
-    """
-    根据用户运势调整鱼的权重，并返回相应的权重值。
-    - 参数
-      - user_id: 用户的唯一标识符
-      - fish_quality: 包含鱼种质量的列表
-    - 返回
-      - 一个包含鱼权重的列表
-      - 一个布尔值，指示是否进行了调整
-      - 运势星级数（如果有的话），否则为 None
+class FishInfo(NamedTuple):
+    quality: str
+    price_mpr: float
+    long: tuple[int, int]
+
+
+# 鱼名 -> 品质、单价、长度范围，同名的鱼以先出现的品质为准
+FISH_CATALOG: Mapping[str, FishInfo] = MappingProxyType(
+    {
+        fish_name: FishInfo(quality, attrs["price_mpr"], attrs["long"])
+        for quality, attrs in reversed(fish.items())
+        for fish_name in attrs["fish"]
+    }
+)
+FISH_QUALITIES = tuple(fish)
+
+
+@cache
+def get_cum_weights(luck_star_num: int | None) -> tuple[int, ...]:
     """
-    luck_star_num = await get_user_luck_star(user_id)
+    根据用户运势调整品质权重，返回按 `FISH_QUALITIES` 顺序的累积权重
 
-    adjustment_made = False
-    # 创建临时权重列表，不修改全局 fish 字典
+    结果按星级缓存，运势星级 0~7 在加载时预先计算
+    """
     weights = []
-
-    for key in fish_quality:
-        original_weight = fish[key]["weight"]
-        if key in ["隐火", "虚空", "金"] and luck_star_num is not None:
-            # 只要有运势就标记为调整过，不管权重是否实际变化
-            adjustment_made = True
+    for quality in FISH_QUALITIES:
+        original_weight = fish[quality]["weight"]
+        if quality in ["隐火", "虚空", "金"] and luck_star_num is not None:
             weight_increase = calculate_weight_increase(luck_star_num)
-            new_weight = min(original_weight + weight_increase, MAX_WEIGHT_INCREASE)
-            weights.append(int(new_weight))
+            weights.append(
+                int(min(original_weight + weight_increase, MAX_WEIGHT_INCREASE))
+            )
         else:
             weights.append(original_weight)
+    return tuple(accumulate(weights))
+
 
-    return weights, adjustment_made, luck_star_num
+for _luck_star_num in (None, *range(8)):
+    get_cum_weights(_luck_star_num)
 
 
 async def choice(user_id: str) -> tuple[str, int, bool, int | None]:
@@ -135,86 +234,121 @@ async def choice(user_id: str) -> tuple[str, int, bool, int | None]:
     - 返回
       - 选择的鱼的名称
       - 鱼的长度
-      - 是否进行了权重调整
+      - 是否进行了权重调整（只要有运势就视为调整过）
       - 运势星级数（如果有的话），否则为 None
     """
-    fish_quality = list(fish.keys())
-    fish_quality_weight = await get_weight(user_id=user_id, fish_quality=fish_quality)
-    quality = random.choices(fish_quality, weights=fish_quality_weight[0])[0]
+    luck_star_num = await get_user_luck_star(user_id)
+    # 传入累积权重时 random.choices 直接二分查找
+    quality = random.choices(
+        FISH_QUALITIES, cum_weights=get_cum_weights(luck_star_num)
+    )[0]
 
     return (
         random.choice(fish[quality]["fish"]),
-        random.randint(fish[quality]["long"][0], fish[quality]["long"][1]),
-        fish_quality_weight[1],
-        fish_quality_weight[2],
+        random.randint(*fish[quality]["long"]),
+        luck_star_num is not None,
+        luck_star_num,
     )
 
 
 def get_quality(fish_name: str) -> str:
     """获取鱼的品质"""
-    for quality in fish:
-        if fish_name in fish[quality]["fish"]:
-            return quality
-    raise ValueError(f"未知的鱼：{fish_name}")
+    try:
+        return FISH_CATALOG[fish_name].quality
+    except KeyError:
+        raise ValueError(f"未知的鱼：{fish_name}") from None
 
 
 def get_price(fish_name: str, fish_long: int) -> float:
     """获取鱼的价格"""
-    for quality in fish:
-        if fish_name in fish[quality]["fish"]:
-            return fish[quality]["price_mpr"] * fish_long
-    raise ValueError(f"未知的鱼：{fish_name}")
+    try:
+        return FISH_CATALOG[fish_name].price_mpr * fish_long
+    except KeyError:
+        raise ValueError(f"未知的鱼：{fish_name}") from None
+
+
+def _upsert_inventory(session: AsyncSession, values: dict | list[dict]) -> Insert:
+    """向背包库存累加鱼，已有同名鱼时合并个数、总长度和最大长度"""
+    return upsert(
+        session,
+        FishingInventory,
+        values,
+        ["user_id", "fish_name"],
+        count=lambda new: FishingInventory.count + new.count,
+        total_length=lambda new: FishingInventory.total_length + new.total_length,
+        max_length=lambda new: case(
+            (new.max_length > FishingInventory.max_length, new.max_length),
+            else_=FishingInventory.max_length,
+        ),
+    )
 
 
 async def save_fish(user_id: str, fish_name: str, fish_long: int) -> None:
-    """向数据库写入鱼以持久化保存"""
+    """向数据库写入鱼以持久化保存，钓鱼记录与背包库存各一条 upsert"""
     time_now = int(time.time())
     fishing_limit = config.fishing_limit
 
     async with get_session() as session:
-        stmt = select(FishingRecord).where(FishingRecord.user_id == user_id)
-        result = await session.execute(stmt)
-        record = result.scalar_one_or_none()
-
-        if record:
-            loads_fishes: dict[str, list[int]] = json.loads(record.fishes)
-            try:
-                loads_fishes[fish_name].append(fish_long)
-            except KeyError:
-                loads_fishes[fish_name] = [fish_long]
-            dump_fishes = json.dumps(loads_fishes)
-            record.time = time_now + fishing_limit
-            record.frequency += 1
-            record.fishes = dump_fishes
-            await session.commit()
-        else:
-            data = {fish_name: [fish_long]}
-            dump_fishes = json.dumps(data)
-            new_record = FishingRecord(
-                user_id=user_id,
-                time=time_now + fishing_limit,
-                frequency=1,
-                fishes=dump_fishes,
+        await session.execute(
+            upsert(
+                session,
+                FishingRecord,
+                {"user_id": user_id, "time": time_now + fishing_limit, "frequency": 1},
+                ["user_id"],
+                time=lambda new: new.time,
+                frequency=lambda new: FishingRecord.frequency + new.frequency,
             )
-            session.add(new_record)
-            await session.commit()
+        )
+        await session.execute(
+            _upsert_inventory(
+                session,
+                {
+                    "user_id": user_id,
+                    "fish_name": fish_name,
+                    "count": 1,
+                    "total_length": fish_long,
+                    "max_length": fish_long,
+                },
+            )
+        )
+        await session.commit()
+
+
+async def _get_inventory(
+    session: AsyncSession, user_id: str, *, for_update: bool = False
+) -> list[tuple[str, int, int]]:
+    """按主键读取用户背包，返回 `[(鱼名, 个数, 总长度), ...]`"""
+    stmt = (
+        select(
+            FishingInventory.fish_name,
+            FishingInventory.count,
+            FishingInventory.total_length,
+        )
+        .where(FishingInventory.user_id == user_id)
+        .order_by(FishingInventory.fish_name)
+    )
+    if for_update:
+        # 卖鱼时锁定库存行，避免并发卖出同一批鱼
+        stmt = stmt.with_for_update()
+    return list((await session.execute(stmt)).tuples())
 
 
 async def get_stats(user_id: str) -> str:
     """获取钓鱼统计信息（总长度，次数，次元币总数）"""
     async with get_session() as session:
-        stmt = select(FishingRecord).where(FishingRecord.user_id == user_id)
-        result = await session.execute(stmt)
-        fishing_record = result.scalar_one_or_none()
-
-        if fishing_record:
-            total_length = sum(
-                sum(fish_long)
-                for fish_long in json.loads(fishing_record.fishes).values()
+        frequency = await session.scalar(
+            select(FishingRecord.frequency).where(FishingRecord.user_id == user_id)
+        )
+
+        if frequency is not None:
+            total_length = await session.scalar(
+                select(func.coalesce(func.sum(FishingInventory.total_length), 0)).where(
+                    FishingInventory.user_id == user_id
+                )
             )  # 查询金币插件的历史总金币
-            count_coin = await get_count_coin(user_id)
+            count_coin = await get_count_coin(user_id, session=session)
             return (
-                f"共钓到鱼次数 {fishing_record.frequency} 次\n"
+                f"共钓到鱼次数 {frequency} 次\n"
                 f"背包内鱼总长度 {total_length}cm\n"
                 f"总共获得过 {count_coin} {fishing_coin_name}"
             )
@@ -224,106 +358,75 @@ async def get_stats(user_id: str) -> str:
 async def get_backpack(user_id: str) -> str | list:
     """从数据库查询背包内容"""
     async with get_session() as session:
-        stmt = select(FishingRecord).where(FishingRecord.user_id == user_id)
-        result = await session.execute(stmt)
-        fishes_record = result.scalar_one_or_none()
-
-        if fishes_record:
-            load_fishes = json.loads(fishes_record.fishes)
-            if not load_fishes:
-                return "你的背包里空无一物"
-
-            sorted_fishes = {
-                quality: {
-                    fish_name: fish_info
-                    for fish_name, fish_info in load_fishes.items()
-                    if get_quality(fish_name) == quality
-                }
-                for quality in [
-                    "腐烂",
-                    "发霉",
-                    "普通",
-                    "金",
-                    "虚空",
-                    "隐火",
-                ]
-            }
-            backpack_list = []
-            for quality, fishes in sorted_fishes.items():
-                if fishes:
-                    quality_list = [f"{quality} 鱼:"]
-                    quality_list.extend(
-                        f"  {fish_name}:\n    个数: {len(fish_info)}\n    总长度: {sum(fish_info)}"
-                        for fish_name, fish_info in fishes.items()
-                    )
-                    backpack_list.append("\n".join(quality_list))
-            return backpack_list or "你的背包里空无一物"
-        return "你的背包里空无一物"
+        inventory = await _get_inventory(session, user_id)
+
+    sorted_fishes: dict[str, list[tuple[str, int, int]]] = {
+        quality: [] for quality in ["腐烂", "发霉", "普通", "金", "虚空", "隐火"]
+    }
+    for fish_name, count, total_length in inventory:
+        sorted_fishes[get_quality(fish_name)].append((fish_name, count, total_length))
+
+    backpack_list = []
+    for quality, fishes in sorted_fishes.items():
+        if fishes:
+            quality_list = [f"{quality} 鱼:"]
+            quality_list.extend(
+                f"  {fish_name}:\n    个数: {count}\n    总长度: {total_length}"
+                for fish_name, count, total_length in fishes
+            )
+            backpack_list.append("\n".join(quality_list))
+    return backpack_list or "你的背包里空无一物"
 
 
 async def sell_quality_fish(user_id: str, quality: str) -> str:
     """卖出指定品质的鱼"""
-    async with get_session() as session:
-        stmt = select(FishingRecord).where(FishingRecord.user_id == user_id)
-        result = await session.execute(stmt)
-        fishes_record = result.scalar_one_or_none()
-
-        if fishes_record:
-            load_fishes = json.loads(fishes_record.fishes)
-            if not load_fishes:
-                return "你的背包里空无一物"
-            if quality not in [get_quality(fish_name) for fish_name in load_fishes]:
-                return f"你的背包里没有 {quality} 鱼了"
-            price = sum(
-                round(get_price(fish_name, sum(fish_long)), 2)
-                for fish_name, fish_long in load_fishes.items()
-                if get_quality(fish_name) == quality
+    async with transaction() as session:
+        inventory = await _get_inventory(session, user_id, for_update=True)
+        if not inventory:
+            return "你的背包里空无一物"
+
+        fishes = [
+            (fish_name, total_length)
+            for fish_name, _, total_length in inventory
+            if get_quality(fish_name) == quality
+        ]
+        if not fishes:
+            return f"你的背包里没有 {quality} 鱼了"
+        price = sum(
+            round(get_price(fish_name, total_length), 2)
+            for fish_name, total_length in fishes
+        )
+        await session.execute(
+            delete(FishingInventory).where(
+                FishingInventory.user_id == user_id,
+                FishingInventory.fish_name.in_([fish_name for fish_name, _ in fishes]),
             )
-            await add_coin(user_id, price)
-            load_fishes = {
-                fish_name: fish_long
-                for fish_name, fish_long in load_fishes.items()
-                if get_quality(fish_name) != quality
-            }
-            dump_fishes = json.dumps(load_fishes)
-
-            stmt = (
-                update(FishingRecord)
-                .where(FishingRecord.user_id == user_id)
-                .values(fishes=dump_fishes)
-            )
-            await session.execute(stmt)
-            await session.commit()
-            return f"你卖出了所有 {quality} 鱼，获得了 {price} {fishing_coin_name}"
-        return "你的背包里空无一物"
+        )
+        await add_coin(
+            user_id, price, reason="出售品质鱼", source="fishing", session=session
+        )
+        return f"你卖出了所有 {quality} 鱼，获得了 {price} {fishing_coin_name}"
 
 
 async def sell_all_fish(user_id: str) -> str:
     """卖出所有鱼"""
-    async with get_session() as session:
-        stmt = select(FishingRecord).where(FishingRecord.user_id == user_id)
-        result = await session.execute(stmt)
-        fishes_record = result.scalar_one_or_none()
-
-        if fishes_record:
-            load_fishes = json.loads(fishes_record.fishes)
-            if not load_fishes:
-                return "你的背包里空无一物"
-            price = sum(
-                round(get_price(fish_name, sum(fish_long)), 2)
-                for fish_name, fish_long in load_fishes.items()
-            )
-            # 使用金币插件接口
-            await add_coin(user_id, price)
-            stmt = (
-                update(FishingRecord)
-                .where(FishingRecord.user_id == user_id)
-                .values(fishes="{}")
-            )
-            await session.execute(stmt)
-            await session.commit()
-            return f"你卖出了所有鱼，获得了 {price} {fishing_coin_name}"
-        return "你的背包里空无一物"
+    async with transaction() as session:
+        inventory = await _get_inventory(session, user_id, for_update=True)
+        if not inventory:
+            return "你的背包里空无一物"
+
+        price = sum(
+            round(get_price(fish_name, total_length), 2)
+            for fish_name, _, total_length in inventory
+        )
+        await session.execute(
+            delete(FishingInventory).where(FishingInventory.user_id == user_id)
+        )
+        # 使用金币插件接口，与背包更新在同一事务中提交
+        await add_coin(
+            user_id, price, reason="出售全部鱼", source="fishing", session=session
+        )
+        return f"你卖出了所有鱼，获得了 {price} {fishing_coin_name}"
 
 
 async def sell_fish(user_id: str, fish_name: str) -> str:
@@ -337,31 +440,31 @@ async def sell_fish(user_id: str, fish_name: str) -> str:
     返回：
         - (str): 待回复的文本
     """
-    async with get_session() as session:
-        stmt = select(FishingRecord).where(FishingRecord.user_id == user_id)
-        result = await session.execute(stmt)
-        fishes_record = result.scalar_one_or_none()
-
-        if fishes_record:
-            load_fishes = json.loads(fishes_record.fishes)
-            if fish_name not in load_fishes:
-                return "你的背包里没有这种鱼"
-            fish_long = load_fishes[fish_name]
-            price = round(get_price(fish_name, sum(fish_long)), 2)
-            # 更新金币
-            await add_coin(user_id, price)
-            del load_fishes[fish_name]
-            dump_fishes = json.dumps(load_fishes)
-
-            stmt = (
-                update(FishingRecord)
-                .where(FishingRecord.user_id == user_id)
-                .values(fishes=dump_fishes)
+    async with transaction() as session:
+        row = (
+            await session.execute(
+                select(FishingInventory.count, FishingInventory.total_length)
+                .where(
+                    FishingInventory.user_id == user_id,
+                    FishingInventory.fish_name == fish_name,
+                )
+                .with_for_update()
             )
-            await session.execute(stmt)
-            await session.commit()
-            return f"你卖出了 {fish_name}×{len(fish_long)}，获得了 {price} {fishing_coin_name}"
-        return "你的背包里空无一物"
+        ).one_or_none()
+        if row is None:
+            return "你的背包里没有这种鱼"
+
+        count, total_length = row
+        price = round(get_price(fish_name, total_length), 2)
+        await session.execute(
+            delete(FishingInventory).where(
+                FishingInventory.user_id == user_id,
+                FishingInventory.fish_name == fish_name,
+            )
+        )
+        # 更新金币
+        await add_coin(user_id, price, reason="卖鱼", source="fishing", session=session)
+        return f"你卖出了 {fish_name}×{count}，获得了 {price} {fishing_coin_name}"
 
 
 async def get_balance(user_id: str) -> str:
@@ -370,6 +473,10 @@ async def get_balance(user_id: str) -> str:
     return f"你有 {coin} {fishing_coin_name}" if coin else "你什么也没有 :)"
 
 
+# group_id -> 钓鱼开关，由 switch_fish 更新
+_switch_cache: dict[int, bool] = {}
+
+
 async def switch_fish(event: GroupMessageEvent | PrivateMessageEvent) -> bool:
     """钓鱼开关切换，没有就创建"""
     if isinstance(event, PrivateMessageEvent):
@@ -383,11 +490,13 @@ async def switch_fish(event: GroupMessageEvent | PrivateMessageEvent) -> bool:
         if switch:
             switch.switch = not switch.switch
             await session.commit()
+            _switch_cache[event.group_id] = switch.switch
             return switch.switch
         else:
             new_switch = FishingSwitch(group_id=event.group_id, switch=False)
             session.add(new_switch)
             await session.commit()
+            _switch_cache[event.group_id] = False
             return False
 
 
@@ -395,10 +504,13 @@ async def get_switch_fish(event: GroupMessageEvent | PrivateMessageEvent) -> boo
     """获取钓鱼开关"""
     if isinstance(event, PrivateMessageEvent):
         return True
+    if (cached := _switch_cache.get(event.group_id)) is not None:
+        return cached
 
     async with get_session() as session:
         stmt = select(FishingSwitch).where(FishingSwitch.group_id == event.group_id)
         result = await session.execute(stmt)
         switch = result.scalar_one_or_none()
 
-        return switch.switch if switch else True
+    _switch_cache[event.group_id] = switch.switch if switch else True
+    return _switch_cache[event.group_id]
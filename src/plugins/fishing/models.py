@@ -3,7 +3,7 @@ from nonebot import require
 require("nonebot_plugin_orm")
 
 from nonebot_plugin_orm import Model
-from sqlalchemy import Boolean, Integer, String, Text
+from sqlalchemy import BigInteger, Boolean, Integer, String
 from sqlalchemy.orm import Mapped, mapped_column
 
 
@@ -11,10 +11,21 @@ class FishingRecord(Model):
     __tablename__ = "fishing_fishingrecord"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    user_id: Mapped[str] = mapped_column(String(32))
+    user_id: Mapped[str] = mapped_column(String(32), unique=True, index=True)
     time: Mapped[int] = mapped_column(Integer)
     frequency: Mapped[int] = mapped_column(Integer)
-    fishes: Mapped[str] = mapped_column(Text)
+
+
+class FishingInventory(Model):
+    """背包库存，每个用户每种鱼一行"""
+
+    __tablename__ = "fishing_inventory"
+
+    user_id: Mapped[str] = mapped_column(String(32), primary_key=True)
+    fish_name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    count: Mapped[int] = mapped_column(Integer)
+    total_length: Mapped[int] = mapped_column(BigInteger)
+    max_length: Mapped[int] = mapped_column(Integer)
 
 
 class FishingSwitch(Model):
@@ -0,0 +1,63 @@
+from nonebot import get_driver, logger, on_notice
+from nonebot.adapters.onebot.v11 import (
+    Bot,
+    GroupDecreaseNoticeEvent,
+    GroupIncreaseNoticeEvent,
+    NoticeEvent,
+)
+from nonebot.plugin import PluginMetadata
+
+from .bot_groups import BotGroupIndex, bot_group_index
+from .cache import Member, get_member_name, get_member_names, get_members, member_cache
+
+__all__ = [
+    "BotGroupIndex",
+    "Member",
+    "bot_group_index",
+    "get_member_name",
+    "get_member_names",
+    "get_members",
+    "member_cache",
+]
+
+__plugin_meta__ = PluginMetadata(
+    name="群成员缓存",
+    description="缓存群成员列表与各机器人所在群组，收到成员变动通知时自动更新",
+    usage="供其他插件调用",
+    supported_adapters={"~onebot.v11"},
+)
+
+driver = get_driver()
+driver.on_startup(bot_group_index.load)
+
+
+@driver.on_bot_connect
+async def _(bot: Bot):
+    try:
+        await bot_group_index.refresh(bot)
+    except Exception as e:
+        logger.warning(f"校准机器人 {bot.self_id} 群组索引失败: {e}")
+
+
+member_notice = on_notice(priority=1, block=False)
+
+
+@member_notice.handle()
+async def _(bot: Bot, event: NoticeEvent):
+    if isinstance(event, GroupIncreaseNoticeEvent | GroupDecreaseNoticeEvent):
+        member_cache.invalidate(bot.self_id, event.group_id)
+        if event.is_tome():
+            if isinstance(event, GroupIncreaseNoticeEvent):
+                await bot_group_index.add(event.self_id, event.group_id)
+            else:
+                await bot_group_index.remove(event.self_id, event.group_id)
+    elif event.notice_type == "group_card":
+        # go-cqhttp 扩展事件，适配器中没有对应的事件类，字段以 extra 形式存在
+        group_id: int = getattr(event, "group_id")
+        if card_new := getattr(event, "card_new", ""):
+            member_cache.update_name(
+                bot.self_id, group_id, getattr(event, "user_id"), card_new
+            )
+        else:
+            # 清空名片后应显示昵称，缓存中没有昵称，只能重新拉取
+            member_cache.invalidate(bot.self_id, group_id)
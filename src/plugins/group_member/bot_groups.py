@@ -0,0 +1,119 @@
+"""机器人 -> 群组索引，多账号部署时用于判断群内已有哪些机器人"""
+
+import asyncio
+from collections.abc import Iterable
+
+from nonebot import logger
+from nonebot.adapters.onebot.v11 import Bot
+from nonebot_plugin_orm import get_session
+from sqlalchemy import delete, select
+
+from .models import BotGroup
+
+
+class BotGroupIndex:
+    """
+    维护 group_id -> {bot_id} 的内存索引
+
+    启动时从数据库加载，机器人连接时用 `get_group_list` 全量校准一次，
+    之后由进退群通知增量更新；所有变动同步写回数据库。
+    """
+
+    def __init__(self):
+        self._bots: dict[int, set[int]] = {}  # group_id -> {bot_id}
+        self._groups: dict[int, set[int]] = {}  # bot_id -> {group_id}
+        # 群名、人数只在内存中保留最近一次 get_group_list 的结果
+        self._group_info: dict[int, dict] = {}
+        self._lock = asyncio.Lock()
+
+    async def load(self):
+        async with get_session() as session:
+            rows = (
+                await session.execute(select(BotGroup.bot_id, BotGroup.group_id))
+            ).all()
+        self._bots.clear()
+        self._groups.clear()
+        for bot_id, group_id in rows:
+            self._bots.setdefault(group_id, set()).add(bot_id)
+            self._groups.setdefault(bot_id, set()).add(group_id)
+        logger.debug(f"群组索引已加载 {len(rows)} 条记录")
+
+    async def refresh(self, bot: Bot):
+        """用 `get_group_list` 校准指定机器人的群组"""
+        group_list = await bot.get_group_list()
+        for group in group_list:
+            self._group_info[group["group_id"]] = group
+        bot_id = int(bot.self_id)
+        current = {group["group_id"] for group in group_list}
+        known = self._groups.get(bot_id, set())
+        await self._apply(bot_id, current - known, known - current)
+        logger.info(f"机器人 {bot_id} 加入了 {len(current)} 个群组")
+
+    async def add(self, bot_id: int, group_id: int):
+        if group_id not in self._groups.get(bot_id, ()):
+            await self._apply(bot_id, {group_id}, set())
+
+    async def remove(self, bot_id: int, group_id: int):
+        self._group_info.pop(group_id, None)
+        if group_id in self._groups.get(bot_id, ()):
+            await self._apply(bot_id, set(), {group_id})
+
+    async def _apply(self, bot_id: int, added: set[int], removed: set[int]):
+        if not added and not removed:
+            return
+        async with self._lock:
+            groups = self._groups.setdefault(bot_id, set())
+            added -= groups
+            removed &= groups
+            for group_id in added:
+                self._bots.setdefault(group_id, set()).add(bot_id)
+            for group_id in removed:
+                bots = self._bots[group_id]
+                bots.discard(bot_id)
+                if not bots:
+                    del self._bots[group_id]
+            groups |= added
+            groups -= removed
+
+            async with get_session() as session:
+                if removed:
+                    await session.execute(
+                        delete(BotGroup).where(
+                            BotGroup.bot_id == bot_id, BotGroup.group_id.in_(removed)
+                        )
+                    )
+                session.add_all(
+                    BotGroup(bot_id=bot_id, group_id=group_id) for group_id in added
+                )
+                await session.commit()
+
+    def bots_in(self, group_id: int) -> frozenset[int]:
+        """群内的机器人"""
+        return frozenset(self._bots.get(group_id, ()))
+
+    def groups_of(self, bot_id: int) -> frozenset[int]:
+        """机器人所在的群组"""
+        return frozenset(self._groups.get(bot_id, ()))
+
+    def group_info(self, group_id: int) -> dict | None:
+        """最近一次校准时的群信息 (group_name, member_count 等)"""
+        return self._group_info.get(group_id)
+
+    def duplicates(self, bot_ids: Iterable[int] | None = None) -> dict[int, list[int]]:
+        """
+        查找有多个机器人的群组
+
+        :参数:
+          * `bot_ids`: 只统计这些机器人，默认统计全部
+        """
+        allowed = None if bot_ids is None else set(bot_ids)
+        result = {}
+        for group_id, bots in self._bots.items():
+            if allowed is not None:
+                bots = bots & allowed
+            if len(bots) > 1:
+                result[group_id] = sorted(bots)
+        return result
+
+
+bot_group_index = BotGroupIndex()
@@ -0,0 +1,153 @@
+"""群成员列表缓存，供其他插件调用"""
+
+import asyncio
+import time
+from collections.abc import Iterable
+from contextlib import suppress
+from typing import NamedTuple
+
+from nonebot.adapters.onebot.v11 import Bot
+
+from U1.outbound import outbound
+
+CacheKey = tuple[str, int]
+
+
+class Member(NamedTuple):
+    user_id: int
+    name: str  # 群名片，没有则为昵称
+    last_sent_time: int
+
+
+class MemberCache:
+    """
+    按 (bot, 群) 缓存精简后的成员列表
+
+    成员变动通知会使对应缓存失效；同一个群的并发未命中只会发起一次 API 调用。
+    拉取期间被失效的结果只返回给本次调用方，不写入缓存。
+    """
+
+    def __init__(self, ttl: float = 600):
+        self.ttl = ttl
+        self._members: dict[CacheKey, tuple[float, tuple[Member, ...]]] = {}
+        self._pending: dict[CacheKey, asyncio.Future[tuple[Member, ...]]] = {}
+        # 每次失效加一，用于丢弃失效前发起的拉取结果
+        self._generations: dict[CacheKey, int] = {}
+
+    async def get(self, bot: Bot, group_id: int) -> tuple[Member, ...]:
+        key = (bot.self_id, group_id)
+        while True:
+            cached = self._members.get(key)
+            if cached is not None and cached[0] > time.monotonic():
+                return cached[1]
+
+            if (pending := self._pending.get(key)) is None:
+                return await self._fetch(bot, group_id, key)
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                # 发起拉取的任务被取消时重新拉取，自身被取消则照常抛出
+                if not pending.cancelled():
+                    raise
+
+    async def _fetch(
+        self, bot: Bot, group_id: int, key: CacheKey
+    ) -> tuple[Member, ...]:
+        generation = self._generations.get(key, 0)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[key] = future
+        try:
+            members = tuple(
+                Member(
+                    member["user_id"],
+                    member.get("card") or member.get("nickname", ""),
+                    member.get("last_sent_time", 0),
+                )
+                for member in await outbound.call(
+                    bot, "get_group_member_list", group_id=group_id
+                )
+            )
+        except Exception as e:
+            future.set_exception(e)
+            # 避免无人等待时出现 "exception was never retrieved"
+            future.exception()
+            raise
+        else:
+            if self._generations.get(key, 0) == generation:
+                self._members[key] = (time.monotonic() + self.ttl, members)
+            future.set_result(members)
+            return members
+        finally:
+            # 发起方被取消时 future 仍未完成，需要唤醒等待者
+            if not future.done():
+                future.cancel()
+            del self._pending[key]
+
+    def peek(self, bot_id: str, group_id: int) -> tuple[Member, ...] | None:
+        """只读取未过期的缓存，不发起 API 调用"""
+        cached = self._members.get((bot_id, group_id))
+        if cached is not None and cached[0] > time.monotonic():
+            return cached[1]
+        return None
+
+    def invalidate(self, bot_id: str, group_id: int):
+        key = (bot_id, group_id)
+        self._members.pop(key, None)
+        self._generations[key] = self._generations.get(key, 0) + 1
+
+    def update_name(self, bot_id: str, group_id: int, user_id: int, name: str):
+        """群名片变动时原地更新，无需重新拉取整个列表"""
+        key = (bot_id, group_id)
+        if (cached := self._members.get(key)) is None:
+            return
+        expires_at, members = cached
+        self._members[key] = (
+            expires_at,
+            tuple(
+                member._replace(name=name) if member.user_id == user_id else member
+                for member in members
+            ),
+        )
+
+
+member_cache = MemberCache()
+
+
+async def get_members(bot: Bot, group_id: int) -> tuple[Member, ...]:
+    """获取群成员列表（带缓存）"""
+    return await member_cache.get(bot, group_id)
+
+
+async def get_member_names(
+    bot: Bot, group_id: int, user_ids: Iterable[int], concurrency: int = 8
+) -> dict[int, str]:
+    """
+    批量获取群成员名片/昵称
+
+    优先从成员列表缓存中查找，列表中没有的再以有限并发逐个查询；
+    查询失败（如已退群）的用户不会出现在返回结果中。
+    """
+    user_ids = set(user_ids)
+    names = {member.user_id: member.name for member in await get_members(bot, group_id)}
+    result = {user_id: names[user_id] for user_id in user_ids & names.keys()}
+    missing = user_ids - names.keys()
+    if not missing:
+        return result
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch(user_id: int):
+        async with semaphore:
+            with suppress(Exception):
+                info = await outbound.call(
+                    bot, "get_group_member_info", group_id=group_id, user_id=user_id
+                )
+                result[user_id] = info["card"] or info["nickname"]
+
+    await asyncio.gather(*map(fetch, missing))
+    return result
+
+
+async def get_member_name(bot: Bot, group_id: int, user_id: int) -> str | None:
+    """获取单个群成员的名片/昵称，获取失败返回 None"""
+    return (await get_member_names(bot, group_id, (user_id,))).get(user_id)
@@ -0,0 +1,16 @@
+from nonebot import require
+
+require("nonebot_plugin_orm")
+
+from nonebot_plugin_orm import Model
+from sqlalchemy import BigInteger
+from sqlalchemy.orm import Mapped, mapped_column
+
+
+class BotGroup(Model):
+    """机器人所在群组表 - 重启后用于预热群组索引"""
+
+    __tablename__ = "bot_group"
+
+    bot_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    group_id: Mapped[int] = mapped_column(BigInteger, primary_key=True, index=True)
@@ -0,0 +1,101 @@
+import hmac
+import time
+
+from nonebot import get_driver, logger
+from nonebot.adapters import Bot, Event
+from nonebot.consts import CMD_KEY, PREFIX_KEY
+from nonebot.drivers import URL, ASGIMixin, HTTPServerSetup, Request, Response
+from nonebot.matcher import Matcher
+from nonebot.message import event_preprocessor, run_postprocessor, run_preprocessor
+from nonebot.plugin import PluginMetadata
+
+from U1.metrics import Counter, Histogram, render_all
+
+from .config import Config, config
+
+__plugin_meta__ = PluginMetadata(
+    name="运行指标",
+    description="按事件处理器统计调用次数、错误次数与耗时，以 Prometheus 格式导出",
+    usage=f"GET {config.metrics_path}",
+    type="application",
+    config=Config,
+)
+
+START_KEY = "_metrics_start"
+
+events_total = Counter(
+    "u1_events_total", "机器人收到的事件数", ("bot_id", "event_type")
+)
+matcher_calls_total = Counter(
+    "u1_matcher_calls_total", "事件处理器调用次数", ("plugin", "command")
+)
+matcher_errors_total = Counter(
+    "u1_matcher_errors_total",
+    "事件处理器异常次数",
+    ("plugin", "command", "exception"),
+)
+matcher_latency = Histogram(
+    "u1_matcher_latency_seconds",
+    "事件处理器耗时",
+    ("plugin", "command"),
+    buckets=config.metrics_buckets,
+)
+
+
+def matcher_labels(matcher: Matcher) -> tuple[str, str]:
+    """(插件名, 命令)，非命令类事件响应器的命令记为 `-`"""
+    command = matcher.state.get(PREFIX_KEY, {}).get(CMD_KEY)
+    return matcher.plugin_id or "unknown", ".".join(command) if command else "-"
+
+
+@event_preprocessor
+async def count_event(bot: Bot, event: Event):
+    events_total.inc(bot.self_id, event.get_type())
+
+
+@run_preprocessor
+async def start_timer(matcher: Matcher):
+    matcher.state[START_KEY] = time.perf_counter()
+
+
+@run_postprocessor
+async def record_matcher(matcher: Matcher, exception: Exception | None):
+    start = matcher.state.pop(START_KEY, None)
+    labels = matcher_labels(matcher)
+    matcher_calls_total.inc(*labels)
+    if start is not None:
+        matcher_latency.observe(time.perf_counter() - start, *labels)
+    if exception is not None:
+        matcher_errors_total.inc(*labels, type(exception).__name__)
+
+
+def authorized(request: Request) -> bool:
+    if config.metrics_token is None:
+        return True
+    scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+    return scheme.lower() == "bearer" and hmac.compare_digest(
+        token.encode(), config.metrics_token.encode()
+    )
+
+
+async def handle_metrics(request: Request) -> Response:
+    if not authorized(request):
+        return Response(401, headers={"WWW-Authenticate": "Bearer"})
+    return Response(
+        200,
+        headers={"Content-Type": "text/plain; version=0.0.4; charset=utf-8"},
+        content=render_all(),
+    )
+
+
+driver = get_driver()
+if isinstance(driver, ASGIMixin):
+    driver.setup_http_server(
+        HTTPServerSetup(URL(config.metrics_path), "GET", "metrics", handle_metrics)
+    )
+    if config.metrics_token is None:
+        logger.warning(
+            f"指标路由 {config.metrics_path} 未设置 METRICS_TOKEN，任何人都可以访问"
+        )
+else:
+    logger.warning("当前驱动器不支持 HTTP 服务，指标路由未注册")
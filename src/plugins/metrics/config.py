@@ -0,0 +1,24 @@
+from nonebot import get_plugin_config
+from pydantic import BaseModel
+
+
+class Config(BaseModel):
+    metrics_path: str = "/metrics"  # Prometheus 拉取路径
+    # 设置后拉取时需携带 `Authorization: Bearer <token>`
+    metrics_token: str | None = None
+    metrics_buckets: list[float] = [
+        0.005,
+        0.01,
+        0.025,
+        0.05,
+        0.1,
+        0.25,
+        0.5,
+        1,
+        2.5,
+        5,
+        10,
+    ]  # 耗时直方图分桶 (s)
+
+
+config = get_plugin_config(Config)
@@ -1,7 +1,8 @@
-import httpx
 from nonebot import logger, on_command
 from nonebot.plugin import PluginMetadata
 
+from U1.utils.request import get_client
+
 __help_version__ = "0.1.0"
 __help_plugin_name__ = "网抑云"
 __usage__ = """指令：网抑云 | 网易云热评  随机一条网易云热评"""
@@ -16,8 +17,8 @@ hitokoto_matcher = on_command("网抑云", aliases={"网易云热评"}, block=Tr
 
 @hitokoto_matcher.handle()
 async def hitokoto():
-    async with httpx.AsyncClient(verify=False) as client:
-        response = await client.get(r"https://international.v1.hitokoto.cn/?c=j")
+    url = "https://international.v1.hitokoto.cn/?c=j"
+    response = await get_client(url, verify=False).get(url)
     if response.is_error:
         logger.error("获取网抑云失败咯，请稍后再试...")
         return
@@ -1,8 +1,10 @@
 import asyncio
 
-from httpx import AsyncClient, Response
+from httpx import Response
 from nonebot.log import logger
 
+from U1.utils.request import get_client
+
 from .config import QWEATHER_FORECASE_DAYS
 from .model import AirApi, DailyApi, HourlyApi, NowApi, WarningApi
 
@@ -75,9 +77,7 @@ class Weather:
         self._data_validate()
 
     async def _get_data(self, url: str, params: dict) -> Response:
-        async with AsyncClient() as client:
-            res = await client.get(url, params=params)
-        return res
+        return await get_client(url).get(url, params=params)
 
     async def _get_city_id(self, api_type: str = "lookup"):
         res = await self._get_data(
@@ -1,13 +1,14 @@
 from typing import TYPE_CHECKING
 
 from cookit.loguru import warning_suppress
-from httpx import AsyncClient
 from nonebot_plugin_alconna.builtins.uniseg.music_share import (
     MusicShare,
     MusicShareKind,
 )
 from nonebot_plugin_alconna.uniseg import UniMessage
 
+from U1.utils.request import get_client
+
 from ...config import config
 
 if TYPE_CHECKING:
@@ -16,23 +17,26 @@ if TYPE_CHECKING:
 
 async def sign_music_card(info: "SongInfo") -> str:
     assert config.ncm_card_sign_url
-    async with AsyncClient(
-        follow_redirects=True,
-        timeout=config.ncm_card_sign_timeout,
-    ) as cli:
-        body = {
-            "type": "custom",
-            "url": info.url,
-            "audio": info.playable_url,
-            "title": info.display_name,
-            "image": info.cover_url,
-            "singer": info.display_artists,
-        }
-        return (
-            (await cli.post(config.ncm_card_sign_url, json=body))
-            .raise_for_status()
-            .text
+    body = {
+        "type": "custom",
+        "url": info.url,
+        "audio": info.playable_url,
+        "title": info.display_name,
+        "image": info.cover_url,
+        "singer": info.display_artists,
+    }
+    cli = get_client(config.ncm_card_sign_url)
+    return (
+        (
+            await cli.post(
+                config.ncm_card_sign_url,
+                json=body,
+                timeout=config.ncm_card_sign_timeout,
+            )
         )
+        .raise_for_status()
+        .text
+    )
 
 
 async def send_song_card_msg(song: "BaseSong"):
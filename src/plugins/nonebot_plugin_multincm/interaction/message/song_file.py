@@ -3,11 +3,12 @@ from contextlib import suppress
 from typing import TYPE_CHECKING, Any, cast
 
 from cookit.loguru import warning_suppress
-from httpx import AsyncClient
 from nonebot import logger
 from nonebot.matcher import current_bot, current_event
 from nonebot_plugin_alconna.uniseg import Receipt, UniMessage, get_exporter
 
+from U1.utils.request import get_client
+
 from ...config import config
 from ...const import SONG_CACHE_DIR
 from ...utils import encode_silk, ffmpeg_exists
@@ -22,12 +23,12 @@ async def download_song(info: "SongInfo"):
     filename = info.download_filename
     file_path = SONG_CACHE_DIR / filename
     if not file_path.exists():
-        async with AsyncClient(follow_redirects=True) as cli:
-            async with cli.stream("GET", info.playable_url) as resp:
-                resp.raise_for_status()
-                with file_path.open("wb") as f:
-                    async for chunk in resp.aiter_bytes():
-                        f.write(chunk)
+        cli = get_client(info.playable_url)
+        async with cli.stream("GET", info.playable_url) as resp:
+            resp.raise_for_status()
+            with file_path.open("wb") as f:
+                async for chunk in resp.aiter_bytes():
+                    f.write(chunk)
     return file_path
 
 
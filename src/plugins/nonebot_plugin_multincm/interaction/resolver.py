@@ -5,7 +5,6 @@ from typing import Annotated, TypeAlias
 from cachetools import TTLCache
 from cookit import flatten, queued
 from cookit.loguru import warning_suppress
-from httpx import AsyncClient
 from nonebot.adapters import Bot as BaseBot
 from nonebot.adapters import Message as BaseMessage
 from nonebot.consts import REGEX_MATCHED
@@ -15,6 +14,8 @@ from nonebot.typing import T_State
 from nonebot_plugin_alconna import UniMsg
 from nonebot_plugin_alconna.uniseg import Hyper, Reply, UniMessage
 
+from U1.utils.request import get_client
+
 from ..config import config
 from ..const import SHORT_URL_BASE, SHORT_URL_REGEX, URL_REGEX
 from ..data_source import (
@@ -88,17 +89,19 @@ async def resolve_short_url(
     expected_type: ExpectedTypeType | None = None,
     use_cool_down: bool = False,
 ) -> GeneralSongOrPlaylist:
-    async with AsyncClient(base_url=SHORT_URL_BASE) as client:
-        resp = await client.get(suffix, follow_redirects=False)
+    resp = await get_client(SHORT_URL_BASE).get(
+        f"{SHORT_URL_BASE}/{suffix.lstrip('/')}",
+        follow_redirects=False,
+    )
 
-        if resp.status_code // 100 != 3:
-            raise ValueError(
-                f"Short url {suffix} returned invalid status code {resp.status_code}",
-            )
+    if resp.status_code // 100 != 3:
+        raise ValueError(
+            f"Short url {suffix} returned invalid status code {resp.status_code}",
+        )
 
-        location = resp.headers.get("Location")
-        if not location:
-            raise ValueError(f"Short url {suffix} returned no location header")
+    location = resp.headers.get("Location")
+    if not location:
+        raise ValueError(f"Short url {suffix} returned no location header")
 
     matched = re.search(URL_REGEX, location, re.IGNORECASE)
     if not matched:
@@ -6,9 +6,11 @@ from pathlib import Path
 from typing import NamedTuple, TypeVar
 
 import anyio
-from httpx import AsyncClient, Response
+from httpx import Response
 from nonebot import logger
 
+from U1.utils.request import get_client
+
 from .config import DEFAULT_BG_PATH, config
 
 
@@ -60,45 +62,40 @@ def resp_to_bg_data(resp: Response):
 
 @bg_provider()
 async def loli():
-    async with AsyncClient(
-        follow_redirects=True,
-        proxy=config.proxy,
-        timeout=config.ps_req_timeout,
-    ) as cli:
-        return resp_to_bg_data(
-            (await cli.get("https://www.loliapi.com/acg/pe")).raise_for_status(),
-        )
+    url = "https://www.loliapi.com/acg/pe"
+    cli = get_client(url, proxy=config.proxy)
+    return resp_to_bg_data(
+        (await cli.get(url, timeout=config.ps_req_timeout)).raise_for_status(),
+    )
 
 
 @bg_provider()
 async def lolicon():
-    async with AsyncClient(
-        follow_redirects=True,
-        proxy=config.proxy,
+    api_url = "https://api.lolicon.app/setu/v2"
+    resp = await get_client(api_url, proxy=config.proxy).get(
+        api_url,
+        params={
+            "r18": config.ps_bg_lolicon_r18_type,
+            "proxy": "false",
+            "excludeAI": "true",
+        },
         timeout=config.ps_req_timeout,
-    ) as cli:
-        resp = await cli.get(
-            "https://api.lolicon.app/setu/v2",
-            params={
-                "r18": config.ps_bg_lolicon_r18_type,
-                "proxy": "false",
-                "excludeAI": "true",
-            },
-        )
-        url = resp.raise_for_status().json()["data"][0]["urls"]["original"]
-        resp = await cli.get(
-            url,
-            headers={
-                "User-Agent": (
-                    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                    "AppleWebKit/537.36 (KHTML, like Gecko) "
-                    "Chrome/119.0.0.0 "
-                    "Safari/537.36"
-                ),
-                "Referer": "https://www.pixiv.net/",
-            },
-        )
-        return resp_to_bg_data(resp)
+    )
+    url = resp.raise_for_status().json()["data"][0]["urls"]["original"]
+    resp = await get_client(url, proxy=config.proxy).get(
+        url,
+        headers={
+            "User-Agent": (
+                "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                "AppleWebKit/537.36 (KHTML, like Gecko) "
+                "Chrome/119.0.0.0 "
+                "Safari/537.36"
+            ),
+            "Referer": "https://www.pixiv.net/",
+        },
+        timeout=config.ps_req_timeout,
+    )
+    return resp_to_bg_data(resp)
 
 
 @bg_provider()
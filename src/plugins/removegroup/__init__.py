@@ -7,6 +7,10 @@ from nonebot.adapters.onebot.v11 import Bot
 from nonebot.exception import FinishedException
 from nonebot.permission import SUPERUSER
 
+from U1.outbound import PRIORITY_LOW, outbound
+
+from ..group_member import bot_group_index, get_members
+
 # 机器人优先级配置 (数字越大优先级越高)
 BOT_PRIORITY = {
     1184441051: 1,  # 优先级最低
@@ -38,8 +42,7 @@ def condition(group_info):
 async def get_group_member_list_safe(bot: Bot, group_id: int) -> list[int]:
     """安全获取群成员列表"""
     try:
-        group_member_list = await bot.get_group_member_list(group_id=group_id)
-        return [member["user_id"] for member in group_member_list]
+        return [member.user_id for member in await get_members(bot, group_id)]
     except Exception as e:
         logger.warning(f"获取群 {group_id} 成员列表失败: {e}")
         return []
@@ -71,15 +74,11 @@ async def batch_get_group_members(
             else:
                 group_member_lists[group_info["group_id"]] = result
 
-        # 输出进度
+        # 输出进度（调用频率由 outbound 调度器限制）
         completed = min(i + batch_size, total_groups)
         progress = completed / total_groups * 100
         logger.info(f"获取群成员列表进度: {progress:.1f}% ({completed}/{total_groups})")
 
-        # 批次间短暂延迟，避免频率限制
-        if i + batch_size < total_groups:
-            await asyncio.sleep(0.5)
-
     return group_member_lists
 
 
@@ -221,7 +220,8 @@ async def _(bot: Bot):
 async def leave_group_safe(bot: Bot, group_id: int) -> tuple[int, bool, str]:
     """安全退出群组"""
     try:
-        await bot.set_group_leave(group_id=group_id)
+        await outbound.call(bot, "set_group_leave", PRIORITY_LOW, group_id=group_id)
+        await bot_group_index.remove(int(bot.self_id), group_id)
         return group_id, True, "成功退出"
     except Exception as e:
         logger.warning(f"退出群 {group_id} 失败: {e}")
@@ -262,10 +262,6 @@ async def batch_leave_groups(
         progress = completed / total_groups * 100
         logger.info(f"退出群组进度: {progress:.1f}% ({completed}/{total_groups})")
 
-        # 批次间延迟，避免频率限制
-        if i + batch_size < total_groups:
-            await asyncio.sleep(1)
-
     return success_groups, failed_groups
 
 
@@ -352,49 +348,12 @@ async def _(bot: Bot):
     await rgroup.finish("🎯 群组移除操作完成!")
 
 
-async def get_all_bots_groups() -> dict[int, list[dict]]:
-    """获取所有机器人的群组信息"""
-    bots = get_bots()
-    all_bot_groups = {}
-
-    for bot_id, bot in bots.items():
-        try:
-            # 将bot_id转换为整数
-            bot_id_int = int(bot_id)
-            group_list = await bot.get_group_list()
-            all_bot_groups[bot_id_int] = group_list
-            logger.info(f"机器人 {bot_id_int} 加入了 {len(group_list)} 个群组")
-        except Exception as e:
-            logger.error(f"获取机器人 {bot_id} 群组列表失败: {e}")
-            all_bot_groups[int(bot_id)] = []
-
-    return all_bot_groups
-
-
-async def find_duplicate_groups(
-    all_bot_groups: dict[int, list[dict]],
-) -> dict[int, list[int]]:
-    """查找重复的群组"""
-    group_to_bots = {}  # {group_id: [bot_id1, bot_id2, ...]}
-
-    # 收集所有群组和对应的机器人
-    for bot_id, groups in all_bot_groups.items():
-        for group in groups:
-            group_id = group["group_id"]
-            # 跳过免疫群组
-            if group_id == 966016220 or group_id == 713478803:
-                continue
-            if group_id not in group_to_bots:
-                group_to_bots[group_id] = []
-            group_to_bots[group_id].append(bot_id)
-
-    # 找出有多个机器人的群组
-    duplicate_groups = {
-        group_id: bot_list
-        for group_id, bot_list in group_to_bots.items()
-        if len(bot_list) > 1
-    }
-
+def find_duplicate_groups(bot_ids: list[int]) -> dict[int, list[int]]:
+    """从群组索引中查找有多个在线机器人的群组"""
+    duplicate_groups = bot_group_index.duplicates(bot_ids)
+    # 跳过免疫群组
+    duplicate_groups.pop(966016220, None)
+    duplicate_groups.pop(713478803, None)
     return duplicate_groups
 
 
@@ -461,6 +420,7 @@ async def batch_remove_bots_from_groups(
                     success, message = result[1], result[2]
                     if success:
                         success_removals.append((bot_id, group_id))
+                        await bot_group_index.remove(bot_id, group_id)
                     else:
                         failed_removals.append((bot_id, group_id, message))
 
@@ -469,10 +429,6 @@ async def batch_remove_bots_from_groups(
         progress = completed / total_removals * 100
         logger.info(f"移除机器人进度: {progress:.1f}% ({completed}/{total_removals})")
 
-        # 批次间延迟
-        if i + batch_size < total_removals:
-            await asyncio.sleep(1)
-
     return success_removals, failed_removals
 
 
@@ -481,7 +437,7 @@ async def remove_bot_from_group_safe(
 ) -> tuple[int, bool, str]:
     """安全地从群组中移除机器人"""
     try:
-        await bot.set_group_leave(group_id=group_id)
+        await outbound.call(bot, "set_group_leave", PRIORITY_LOW, group_id=group_id)
         return bot_id, True, "成功退出群组"
     except Exception as e:
         logger.warning(f"机器人 {bot_id} 退出群 {group_id} 失败: {e}")
@@ -497,14 +453,13 @@ async def _(bot: Bot):
     await rdup_check.send("🔍 开始检查重复群组...")
 
     try:
-        # 获取所有机器人的群组信息
-        all_bot_groups = await get_all_bots_groups()
+        bot_ids = [int(bot_id) for bot_id in get_bots()]
 
-        if not all_bot_groups:
+        if not bot_ids:
             await rdup_check.finish("❌ 没有找到任何在线的机器人")
 
         # 查找重复的群组
-        duplicate_groups = await find_duplicate_groups(all_bot_groups)
+        duplicate_groups = find_duplicate_groups(bot_ids)
 
         if not duplicate_groups:
             await rdup_check.finish("✅ 没有发现重复的群组")
@@ -515,17 +470,9 @@ async def _(bot: Bot):
 
         for group_id, bot_list in duplicate_groups.items():
             # 获取群组信息
-            group_name = "未知"
-            member_count = "未知"
-
-            for bot_id in bot_list:
-                if bot_id in all_bot_groups:
-                    for group in all_bot_groups[bot_id]:
-                        if group["group_id"] == group_id:
-                            group_name = group["group_name"]
-                            member_count = group["member_count"]
-                            break
-                    break
+            group_info = bot_group_index.group_info(group_id) or {}
+            group_name = group_info.get("group_name", "未知")
+            member_count = group_info.get("member_count", "未知")
 
             # 按优先级排序
             sorted_bots = sorted(
@@ -572,14 +519,13 @@ async def _(bot: Bot):
     await rdup_remove.send("🚀 开始移除重复群组中的机器人...")
 
     try:
-        # 获取所有机器人的群组信息
-        all_bot_groups = await get_all_bots_groups()
+        bot_ids = [int(bot_id) for bot_id in get_bots()]
 
-        if not all_bot_groups:
+        if not bot_ids:
             await rdup_remove.finish("❌ 没有找到任何在线的机器人")
 
         # 查找重复的群组
-        duplicate_groups = await find_duplicate_groups(all_bot_groups)
+        duplicate_groups = find_duplicate_groups(bot_ids)
 
         if not duplicate_groups:
             await rdup_remove.finish("✅ 没有发现重复的群组")
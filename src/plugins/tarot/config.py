@@ -7,6 +7,8 @@ from aiocache import cached
 from nonebot import logger
 from pydantic import BaseModel, Extra
 
+from U1.utils.request import get_client
+
 try:
     import ujson as json
 except ModuleNotFoundError:
@@ -61,17 +63,17 @@ async def download_url(
         + name
     )
 
-    async with httpx.AsyncClient() as client:
-        for i in range(3):
-            try:
-                response: httpx.Response = await client.get(url)
-                if response.status_code != 200:
-                    continue
+    client = get_client(url)
+    for i in range(3):
+        try:
+            response: httpx.Response = await client.get(url)
+            if response.status_code != 200:
+                continue
 
-                return response.json() if is_json else response.content
+            return response.json() if is_json else response.content
 
-            except Exception:
-                logger.warning(f"Error occurred when downloading {url}, {i+1}/3")
+        except Exception:
+            logger.warning(f"Error occurred when downloading {url}, {i+1}/3")
 
     logger.warning("Abort downloading")
     return None
@@ -1,4 +1,3 @@
-import asyncio
 import random
 from io import BytesIO
 from pathlib import Path
@@ -13,6 +12,8 @@ from nonebot.adapters.onebot.v11.event import (
 from nonebot.matcher import Matcher
 from PIL import Image
 
+from U1.outbound import outbound
+
 from .config import EventNotSupport, ResourceError, get_tarot, tarot_config
 
 try:
@@ -129,9 +130,13 @@ class Tarot:
             elif isinstance(event, PrivateMessageEvent):
                 await matcher.send(msg_header + msg_body)
             elif isinstance(event, GroupMessageEvent):
-                await matcher.send(msg_header + msg_body)
-                if i < cards_num - 1:
-                    await asyncio.sleep(1)  # In case of frequency sending
+                # Sending rate is limited by the outbound scheduler
+                await outbound.call(
+                    bot,
+                    "send_group_msg",
+                    group_id=event.group_id,
+                    message=msg_header + msg_body,
+                )
             else:
                 raise EventNotSupport
 
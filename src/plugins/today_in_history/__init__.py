@@ -1,12 +1,13 @@
 from datetime import date
 
-import httpx
 import ujson as json
 from nonebot import get_driver, on_fullmatch, require
 from nonebot.adapters.onebot.v11 import MessageSegment
 from nonebot.plugin import PluginMetadata
 from nonebot_plugin_htmlrender import text_to_pic
 
+from U1.utils.request import get_client
+
 
 require("nonebot_plugin_apscheduler")
 
@@ -68,24 +69,23 @@ def text_handle(text: str) -> dict:
 
 # 信息获取
 async def get_history_info() -> MessageSegment:
-    async with httpx.AsyncClient() as client:
-        month = date.today().strftime("%m")
-        day = date.today().strftime("%d")
-        url = f"https://baike.baidu.com/cms/home/eventsOnHistory/{month}.json"
-        r = await client.get(url)
-        if r.status_code != 200:
-            return MessageSegment.text("获取失败，请重试")
-        r.encoding = "unicode_escape"
-        data = text_handle(r.text)
-        today = f"{month}{day}"
-        s = f"历史上的今天 {today}\n"
-        len_max = len(data[month][month + day])
-        for i in range(len_max):
-            str_year = data[month][today][i]["year"]
-            str_title = data[month][today][i]["title"]
-            s = (
-                f"{s}{str_year} {str_title}"
-                if i == len_max - 1
-                else f"{s}{str_year} {str_title}\n"
-            )
-        return MessageSegment.image(await text_to_pic(s))
+    month = date.today().strftime("%m")
+    day = date.today().strftime("%d")
+    url = f"https://baike.baidu.com/cms/home/eventsOnHistory/{month}.json"
+    r = await get_client(url).get(url)
+    if r.status_code != 200:
+        return MessageSegment.text("获取失败，请重试")
+    r.encoding = "unicode_escape"
+    data = text_handle(r.text)
+    today = f"{month}{day}"
+    s = f"历史上的今天 {today}\n"
+    len_max = len(data[month][month + day])
+    for i in range(len_max):
+        str_year = data[month][today][i]["year"]
+        str_title = data[month][today][i]["title"]
+        s = (
+            f"{s}{str_year} {str_title}"
+            if i == len_max - 1
+            else f"{s}{str_year} {str_title}\n"
+        )
+    return MessageSegment.image(await text_to_pic(s))
@@ -1,10 +1,10 @@
 """这是一个今日运势插件，可以查看今日运势。"""
 
-from nonebot import on_command
+from nonebot import get_driver, on_command
 from nonebot.adapters.onebot.v11 import Bot, MessageEvent
 from nonebot.plugin import PluginMetadata
 
-from .data_source import luck_result
+from .data_source import fortune_table, luck_result
 
 __plugin_meta__ = PluginMetadata(
     name="今日运势",
@@ -12,6 +12,12 @@ __plugin_meta__ = PluginMetadata(
     usage='发送"今日运势"或"运势"',
 )
 
+
+@get_driver().on_startup
+async def _():
+    fortune_table.refresh()
+
+
 Luck = on_command("今日运势", aliases={"运势"}, block=True)
 
 
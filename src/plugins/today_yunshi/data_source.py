@@ -2,13 +2,15 @@
 
 import random
 import time
-from datetime import datetime
+from collections.abc import Iterable
+from datetime import date, datetime
 from os import path
 from pathlib import Path
+from typing import NamedTuple
 from zoneinfo import ZoneInfo
 
-import aiofiles
 import ujson as json
+from nonebot import logger
 from nonebot_plugin_orm import get_session
 from sqlalchemy import select
 
@@ -17,6 +19,107 @@ from .models import MemberData
 luckpath = Path(path.join(path.dirname(__file__), "Fortune.json"))
 
 
+class Fortune(NamedTuple):
+    luckid: int
+    fortune: str  # 运势
+    star_level: str  # 星级
+    poem: str  # 签文
+    explanation: str  # 解签
+    star_count: int
+    text: str  # 格式化好的运势文本
+
+
+class FortuneTable:
+    """
+    运势签表，按 luckid 下标存放在元组中
+
+    文件只在首次使用和修改时间变化时读取；修改时间最多每 `check_interval` 秒检查一次。
+    """
+
+    def __init__(self, file: Path, check_interval: float = 5):
+        self.file = file
+        self.check_interval = check_interval
+        self._entries: tuple[Fortune | None, ...] = ()
+        self._ids: tuple[int, ...] = ()
+        self._mtime: float | None = None
+        self._checked_at = 0.0
+
+    def _build(self) -> tuple[tuple[Fortune | None, ...], tuple[int, ...]]:
+        """读取并解析签表，任何一条格式错误都会抛出异常"""
+        luckdata: dict[str, dict[str, str]] = json.loads(
+            self.file.read_text(encoding="utf-8")
+        )
+        entries: list[Fortune | None] = [None] * (max(map(int, luckdata)) + 1)
+        for key, item in luckdata.items():
+            fortune, star_level = item["运势"], item["星级"]
+            poem, explanation = item["签文"], item["解签"]
+            entries[int(key)] = Fortune(
+                luckid=int(key),
+                fortune=fortune,
+                star_level=star_level,
+                poem=poem,
+                explanation=explanation,
+                star_count=star_level.count("★"),
+                text=f"----\n{fortune}\n{star_level}\n{poem}\n{explanation}\n----",
+            )
+        return tuple(entries), tuple(
+            entry.luckid for entry in entries if entry is not None
+        )
+
+    def refresh(self):
+        now = time.monotonic()
+        if self._mtime is not None and now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+        try:
+            mtime = self.file.stat().st_mtime
+        except OSError as e:
+            logger.warning(f"运势签表读取失败，继续使用旧签表: {e!r}")
+            return
+        if mtime == self._mtime:
+            return
+        # 同一版本的文件只尝试解析一次，避免反复报错
+        self._mtime = mtime
+        try:
+            # 完整解析成功后再替换，失败时保留上一次成功加载的内容
+            self._entries, self._ids = self._build()
+        except (OSError, ValueError, KeyError, TypeError, AttributeError) as e:
+            logger.warning(f"运势签表读取或解析失败，继续使用旧签表: {e!r}")
+
+    def get(self, luckid: int) -> Fortune | None:
+        self.refresh()
+        if 0 <= luckid < len(self._entries):
+            return self._entries[luckid]
+        return None
+
+    def random(self) -> Fortune:
+        self.refresh()
+        return self._entries[random.choice(self._ids)]
+
+
+fortune_table = FortuneTable(luckpath)
+
+# IN 查询每批的用户数
+BULK_CHUNK_SIZE = 500
+
+# user_id -> (日期, 星级)，当天没有运势时星级为 None
+_luck_star_cache: dict[str, tuple[date, int | None]] = {}
+
+
+def today() -> date:
+    """运势按 Asia/Shanghai 的日期划分"""
+    return datetime.now(ZoneInfo("Asia/Shanghai")).date()
+
+
+def _cache_luck_star(user_id: str, star: int | None):
+    _luck_star_cache[user_id] = (today(), star)
+
+
+def _star_count(luckid: int) -> int:
+    fortune = fortune_table.get(luckid)
+    return fortune.star_count if fortune is not None else 0
+
+
 async def get_user_luck_star(user_id: str) -> int | None:
     """
     获取用户今日的运势星级数。
@@ -26,26 +129,57 @@ async def get_user_luck_star(user_id: str) -> int | None:
 
     返回:
         int | None: 运势星级数（0-7），如果用户今天没有运势则返回 None
+
+    结果按（用户, 日期）缓存，`luck_result` 写入运势时同步更新
     """
-    try:
-        async with get_session() as session:
-            stmt = select(MemberData).where(MemberData.user_id == user_id)
-            result = await session.execute(stmt)
-            luck = result.scalar_one_or_none()
-
-            if luck is not None and luck.time.strftime("%Y-%m-%d") == time.strftime(
-                "%Y-%m-%d"
-            ):
-                async with aiofiles.open(luckpath, encoding="utf-8") as f:
-                    luckdata = json.loads(await f.read())
-                    luck_star_num = (
-                        luckdata.get(str(luck.luckid), {}).get("星级", "").count("★")
-                    )
-                    return luck_star_num
-    except (OSError, json.JSONDecodeError) as e:
-        print(f"Error reading or parsing luck data: {e}")
+    cached = _luck_star_cache.get(user_id)
+    if cached is not None and cached[0] == today():
+        return cached[1]
 
-    return None
+    async with get_session() as session:
+        luckid = await session.scalar(
+            select(MemberData.luckid).where(
+                MemberData.user_id == user_id, MemberData.luck_date == today()
+            )
+        )
+
+    star = None if luckid is None else _star_count(luckid)
+    _cache_luck_star(user_id, star)
+    return star
+
+
+async def get_luck_stars_bulk(
+    user_ids: Iterable[str], luck_date: date | None = None
+) -> dict[str, int]:
+    """
+    批量获取用户某天（默认今天）的运势星级数
+
+    参数:
+        user_ids: 用户ID
+        luck_date: 日期
+
+    返回:
+        dict[str, int]: user_id -> 星级数，当天没有运势的用户不在结果中
+    """
+    luck_date = luck_date or today()
+    user_ids = list(dict.fromkeys(user_ids))
+    stars: dict[str, int] = {}
+    async with get_session() as session:
+        for i in range(0, len(user_ids), BULK_CHUNK_SIZE):
+            result = await session.execute(
+                select(MemberData.user_id, MemberData.luckid).where(
+                    MemberData.user_id.in_(user_ids[i : i + BULK_CHUNK_SIZE]),
+                    MemberData.luck_date == luck_date,
+                )
+            )
+            stars.update(
+                (str(user_id), _star_count(luckid)) for user_id, luckid in result
+            )
+
+    if luck_date == today():
+        for user_id in user_ids:
+            _cache_luck_star(user_id, stars.get(user_id))
+    return stars
 
 
 async def get_user_luck_info(user_id: str) -> dict | None:
@@ -58,29 +192,24 @@ async def get_user_luck_info(user_id: str) -> dict | None:
     返回:
         dict | None: 运势信息字典，包含运势、星级、签文、解签等，如果用户今天没有运势则返回 None
     """
-    try:
-        async with get_session() as session:
-            stmt = select(MemberData).where(MemberData.user_id == user_id)
-            result = await session.execute(stmt)
-            luck = result.scalar_one_or_none()
-
-            if luck is not None and luck.time.strftime("%Y-%m-%d") == time.strftime(
-                "%Y-%m-%d"
-            ):
-                async with aiofiles.open(luckpath, encoding="utf-8") as f:
-                    luckdata = json.loads(await f.read())
-                    luck_info = luckdata.get(str(luck.luckid))
-                    if luck_info:
-                        return {
-                            "luckid": luck.luckid,
-                            "star_count": luck_info.get("星级", "").count("★"),
-                            "fortune": luck_info.get("运势", ""),
-                            "star_level": luck_info.get("星级", ""),
-                            "poem": luck_info.get("签文", ""),
-                            "explanation": luck_info.get("解签", ""),
-                        }
-    except (OSError, json.JSONDecodeError) as e:
-        print(f"Error reading or parsing luck data: {e}")
+    async with get_session() as session:
+        luckid = await session.scalar(
+            select(MemberData.luckid).where(
+                MemberData.user_id == user_id, MemberData.luck_date == today()
+            )
+        )
+
+    if luckid is not None:
+        fortune = fortune_table.get(luckid)
+        if fortune is not None:
+            return {
+                "luckid": fortune.luckid,
+                "star_count": fortune.star_count,
+                "fortune": fortune.fortune,
+                "star_level": fortune.star_level,
+                "poem": fortune.poem,
+                "explanation": fortune.explanation,
+            }
 
     return None
 
@@ -96,67 +225,47 @@ async def luck_result(user_id: str, focus: bool = False) -> str:
     返回:
         str: 格式化的运势文本
     """
-    # 加载运势数据
-    async with aiofiles.open(luckpath, encoding="utf-8") as f:
-        luckdata = json.loads(await f.read())
-
     async with get_session() as session:
         # 读取数据库
         stmt = select(MemberData).where(MemberData.user_id == user_id)
         result = await session.execute(stmt)
         member_model = result.scalar_one_or_none()
 
-        if member_model is None:
-            # 如果没有数据则创建数据
-            luck_result_text, luckid = random_luck(luckdata)
-            member_model = MemberData(
-                user_id=user_id,
-                luckid=luckid,
-                time=datetime.now(ZoneInfo("Asia/Shanghai")),
-            )
-            session.add(member_model)
-            await session.commit()
-            return luck_result_text
-        elif (
-            member_model.time.strftime("%Y-%m-%d") == time.strftime("%Y-%m-%d")
+        if (
+            member_model is not None
+            and member_model.luck_date == today()
             and not focus
+            and (fortune := fortune_table.get(member_model.luckid)) is not None
         ):
             # 如果是今天的数据则返回今天的数据
-            r = str(member_model.luckid)
-            result_text = (
-                f"----\n{luckdata[r]['运势']}\n{luckdata[r]['星级']}\n"
-                f"{luckdata[r]['签文']}\n{luckdata[r]['解签']}\n----"
-            )
-            return result_text
-        else:
-            # 如果不是今天的数据则随机运势
-            result_text, luckid = random_luck(luckdata)
-            member_model.luckid = luckid
-            member_model.time = datetime.now(ZoneInfo("Asia/Shanghai"))
-            session.add(member_model)
-            await session.commit()
-            return result_text
+            _cache_luck_star(user_id, fortune.star_count)
+            return fortune.text
 
+        # 如果没有数据或不是今天的数据则随机运势
+        fortune = random_luck()
+        if member_model is None:
+            member_model = MemberData(user_id=user_id)
+        member_model.luckid = fortune.luckid
+        member_model.time = datetime.now(ZoneInfo("Asia/Shanghai"))
+        member_model.luck_date = member_model.time.date()
+        session.add(member_model)
+        await session.commit()
+        _cache_luck_star(user_id, fortune.star_count)
+        return fortune.text
 
-def random_luck(luckdata: dict):
+
+def random_luck() -> Fortune:
     """
     随机获取运势信息。
 
-    参数:
-        luckdata: 运势数据字典
-
     返回:
-        tuple: 运势信息和选择的运势编号。
+        Fortune: 抽中的运势签，元旦固定为 67 号签
     """
-    # 判断是否有在 json 文件中和是否有 time 键值
-    r = random.choice(list(luckdata.keys()))
     if datetime.now(ZoneInfo("Asia/Shanghai")).strftime("%m-%d") == "01-01":
-        r = "67"
-    result_text = (
-        f"----\n{luckdata[r]['运势']}\n{luckdata[r]['星级']}\n"
-        f"{luckdata[r]['签文']}\n{luckdata[r]['解签']}\n----"
-    )
-    return result_text, int(r)
+        fortune = fortune_table.get(67)
+        if fortune is not None:
+            return fortune
+    return fortune_table.random()
 
 
 async def create_or_update_luck(user_id: str, luckid: int) -> None:
@@ -178,14 +287,17 @@ async def create_or_update_luck(user_id: str, luckid: int) -> None:
                 user_id=user_id,
                 luckid=luckid,
                 time=datetime.now(ZoneInfo("Asia/Shanghai")),
+                luck_date=today(),
             )
             session.add(member_model)
         else:
             # 更新现有记录
             member_model.luckid = luckid
             member_model.time = datetime.now(ZoneInfo("Asia/Shanghai"))
+            member_model.luck_date = member_model.time.date()
 
         await session.commit()
+    _cache_luck_star(user_id, _star_count(luckid))
 
 
 async def get_user_luck_raw(user_id: str) -> MemberData | None:
@@ -1,12 +1,12 @@
 # 导入插件方法
-from datetime import datetime
+from datetime import date, datetime
 
 from nonebot import require
 
 require("nonebot_plugin_orm")
 
 from nonebot_plugin_orm import Model
-from sqlalchemy import BigInteger, DateTime, Integer
+from sqlalchemy import BigInteger, Date, DateTime, Integer
 from sqlalchemy.orm import Mapped, mapped_column
 
 
@@ -18,3 +18,5 @@ class MemberData(Model):
     time: Mapped[datetime] = mapped_column(
         DateTime, default=datetime.now, onupdate=datetime.now
     )
+    # 抽签日期（Asia/Shanghai），按日期查询今日运势，跨天无需改写旧数据
+    luck_date: Mapped[date] = mapped_column(Date, default=date.today, index=True)
@@ -1,3 +1,4 @@
+import asyncio
 import random
 from datetime import datetime
 from zoneinfo import ZoneInfo
@@ -10,7 +11,9 @@ from nonebot_plugin_apscheduler import scheduler
 
 require("nonebot_plugin_orm")
 from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
 
+from ..group_member.cache import get_member_name, get_members
 from .card_pool import card_pool
 from .cp_list import cp_list
 from .divorce import bye
@@ -23,6 +26,7 @@ from .models import (
     WaifuLock,
     WaifuRelationship,
 )
+from .relationship import RelationshipGraph, relationship_index
 from .utils import (
     get_message_at,
     get_protected_users,
@@ -81,90 +85,78 @@ happy_end = [
 cd_bye = {}
 
 
-async def reset_record():
-    logger.info("定时重置娶群友记录")
-    yesterday = datetime.now(ZoneInfo("Asia/Shanghai")).replace(
-        hour=0, minute=0, second=0, microsecond=0
-    )
-
+async def delete_in_chunks(model, *where) -> int:
+    """按主键分批删除，每批单独提交并让出事件循环，避免长时间持锁"""
     from nonebot_plugin_orm import get_session
 
-    async with get_session() as session:
-        # 删除所有关系记录
-        delete_relationships = delete(WaifuRelationship).where(
-            WaifuRelationship.created_at < yesterday
-        )
-        await session.execute(delete_relationships)
-
-        # 删除过期的锁定记录
-        delete_locks = delete(WaifuLock).where(
-            (WaifuLock.expires_at.is_not(None)) & (WaifuLock.expires_at < yesterday)
-        )
-        await session.execute(delete_locks)
-
-        await session.commit()
-
-
-async def mo_reset_record():
-    logger.info("手动重置娶群友记录")
-    yesterday = datetime.now(ZoneInfo("Asia/Shanghai")).replace(
+    deleted = 0
+    while True:
+        async with get_session() as session:
+            ids = (
+                await session.scalars(
+                    select(model.id)
+                    .where(*where)
+                    .order_by(model.id)
+                    .limit(settings.waifu_purge_chunk_size)
+                )
+            ).all()
+            if not ids:
+                return deleted
+            await session.execute(delete(model).where(model.id.in_(ids)))
+            await session.commit()
+        deleted += len(ids)
+        await asyncio.sleep(0.1)
+
+
+async def purge_expired_records():
+    """清理往日的CP关系与过期的锁定记录（当天的关系按日期查询，不依赖清理）"""
+    today = datetime.now(ZoneInfo("Asia/Shanghai")).replace(
         hour=0, minute=0, second=0, microsecond=0
     )
-
-    from nonebot_plugin_orm import get_session
-
-    async with get_session() as session:
-        # 删除所有关系记录
-        delete_relationships = delete(WaifuRelationship).where(
-            WaifuRelationship.created_at < yesterday
-        )
-        await session.execute(delete_relationships)
-
-        # 删除过期的锁定记录
-        delete_locks = delete(WaifuLock).where(
-            (WaifuLock.expires_at.is_not(None)) & (WaifuLock.expires_at < yesterday)
-        )
-        await session.execute(delete_locks)
-
-        await session.commit()
-
-
-async def get_user_relationship(session, group_id: int, user_id: int):
-    """获取用户的CP关系（主动方或被动方）"""
-    stmt = (
-        select(WaifuRelationship)
-        .where(
-            WaifuRelationship.group_id == group_id,
-            (
-                (WaifuRelationship.user_id == user_id)
-                | (WaifuRelationship.partner_id == user_id)
-            ),
-        )
-        .limit(1)
+    relationships = await delete_in_chunks(
+        WaifuRelationship, WaifuRelationship.day < today.date()
     )
-    result = await session.execute(stmt)
-    return result.scalar_one_or_none()
+    locks = await delete_in_chunks(
+        WaifuLock, WaifuLock.expires_at.is_not(None), WaifuLock.expires_at < today
+    )
+    logger.info(f"娶群友记录清理完成：CP关系 {relationships} 条，锁定 {locks} 条")
 
 
-async def create_relationship(session, group_id: int, user_id: int, partner_id: int):
-    """创建CP关系"""
-    relationship = WaifuRelationship(
-        group_id=group_id, user_id=user_id, partner_id=partner_id
-    )
-    session.add(relationship)
-    await session.commit()
+async def mo_reset_record():
+    logger.info("手动清理娶群友记录")
+    await purge_expired_records()
 
 
-async def get_taken_users(session, group_id: int) -> list[int]:
-    """获取已被娶的用户列表"""
-    stmt = select(WaifuRelationship.partner_id).where(
-        WaifuRelationship.group_id == group_id
-    )
-    result = await session.execute(stmt)
-    return [row[0] for row in result.fetchall()]
+async def create_relationship(
+    graph: RelationshipGraph, group_id: int, user_id: int, partner_id: int
+) -> bool:
+    """
+    创建CP关系，写库前先占用索引，避免并发时同一个人被娶两次
 
+    :return: 双方在选择期间已被他人占用时返回 False
+    """
+    from nonebot_plugin_orm import get_session
+
+    # 选择过程中有等待，占用前需要重新检查
+    if graph.is_paired(user_id) or graph.is_paired(partner_id):
+        return False
+    graph.add(user_id, partner_id)
+    try:
+        async with get_session() as session:
+            session.add(
+                WaifuRelationship(
+                    group_id=group_id,
+                    user_id=user_id,
+                    partner_id=partner_id,
+                    day=graph.day,
+                )
+            )
+            await session.commit()
+    except Exception:
+        graph.discard(user_id, partner_id)
+        raise
+    return True
 
-scheduler.add_job(reset_record, "cron", hour=0, minute=0, misfire_grace_time=120)
 
 waifu = on_command("娶群友", block=True)
 
@@ -177,49 +169,45 @@ async def handle_waifu(bot: Bot, event: GroupMessageEvent):
     group_id = event.group_id
     user_id = event.user_id
 
-    from nonebot_plugin_orm import get_session
-
-    async with get_session() as session:
-        # 检查是否已有CP
-        existing_relationship = await get_user_relationship(session, group_id, user_id)
-        if existing_relationship:
-            # 确定伴侣ID（如果用户是主动方，取partner_id；如果是被动方，取user_id）
-            if existing_relationship.user_id == user_id:
-                partner_id = existing_relationship.partner_id
-            else:
-                partner_id = existing_relationship.user_id
-            return await handle_existing_cp(bot, event, partner_id)
+    # 检查是否已有CP（主动方或被动方）
+    graph = await relationship_index.get(group_id)
+    if (partner_id := graph.partner_of(user_id)) is not None:
+        return await handle_existing_cp(bot, event, partner_id)
 
-        # 选择逻辑
-        selected = await select_waifu(bot, event, session, group_id, user_id)
-        if not selected:
-            return await waifu.finish(random.choice(no_waifu), at_sender=True)
+    # 选择逻辑
+    selected = await select_waifu(bot, event, graph, user_id)
+    if not selected:
+        return await waifu.finish(random.choice(no_waifu), at_sender=True)
 
-        # 保存记录
-        await create_relationship(session, group_id, user_id, selected)
-        await send_result(bot, event, selected)
+    # 保存记录
+    try:
+        created = await create_relationship(graph, group_id, user_id, selected)
+    except IntegrityError:
+        # 其他实例或索引加载前已写入同一关系
+        created = False
+    if not created:
+        return await waifu.finish(random.choice(no_waifu), at_sender=True)
+    await send_result(bot, event, selected)
 
 
 async def select_waifu(
-    bot: Bot, event: GroupMessageEvent, session, group_id: int, user_id: int
+    bot: Bot, event: GroupMessageEvent, graph: RelationshipGraph, user_id: int
 ) -> int | None:
     """核心选择逻辑"""
-    protected = await get_protected_users(group_id)
-
-    # 获取已被娶的人列表
-    taken_users = await get_taken_users(session, group_id)
+    protected = await get_protected_users(event.group_id)
 
     select = None
     # 尝试通过 @ 选择
     if at := get_message_at(event.message):
-        select = await handle_at_selection(bot, event, at[0], protected, taken_users)
+        select = await handle_at_selection(bot, event, at[0], protected, graph)
     if select is not None:
         return select
 
     # 获取可用成员，排除已被娶的人和已有CP的人
-    members = await get_available_members(bot, group_id, protected)
     available_members = [
-        member for member in members if member != user_id and member not in taken_users
+        member
+        for member in await get_available_members(bot, event.group_id, protected)
+        if member != user_id and not graph.is_paired(member)
     ]
 
     if not available_members:
@@ -229,11 +217,14 @@ async def select_waifu(
     return select
 
 
-async def get_available_members(bot: Bot, group_id: int, protected: list) -> list[int]:
+async def get_available_members(
+    bot: Bot, group_id: int, protected: frozenset[int]
+) -> list[int]:
+    excluded = {*protected, int(bot.self_id), 2854196310}
     return [
-        member["user_id"]
-        for member in await bot.get_group_member_list(group_id=group_id)
-        if member["user_id"] not in [*protected, bot.self_id, 2854196310]
+        member.user_id
+        for member in await get_members(bot, group_id)
+        if member.user_id not in excluded
     ]
 
 
@@ -250,32 +241,31 @@ async def validate_user(bot: Bot, event: GroupMessageEvent) -> bool:
 
 
 async def handle_existing_cp(bot: Bot, event: GroupMessageEvent, existing_cp: int):
-    member = await bot.get_group_member_info(
-        group_id=event.group_id, user_id=existing_cp
-    )
+    name = await get_member_name(bot, event.group_id, existing_cp)
     msg = (
-        f"你已经有 CP 了，不许花心哦~{MessageSegment.image(await user_img(existing_cp))}"
-        f"你的 CP：{member['card'] or member['nickname']}"
+        Message("你已经有 CP 了，不许花心哦~")
+        + MessageSegment.image(await user_img(existing_cp))
+        + f"你的 CP：{name or existing_cp}"
     )
-    await bot.send(event, Message(msg), at_sender=True)
+    await bot.send(event, msg, at_sender=True)
 
 
 async def send_result(bot: Bot, event: GroupMessageEvent, selected: int):
-    member = await bot.get_group_member_info(group_id=event.group_id, user_id=selected)
+    name = await get_member_name(bot, event.group_id, selected)
     msg = (
-        f"你的 CP 是！\n{MessageSegment.image(await user_img(selected))}"
-        f"『{member['card'] or member['nickname']}』!"
-        f"\n{random.choice(happy_end)}"
+        Message("你的 CP 是！\n")
+        + MessageSegment.image(await user_img(selected))
+        + f"『{name or selected}』!\n{random.choice(happy_end)}"
     )
-    await waifu.finish(Message(msg), at_sender=True)
+    await waifu.finish(msg, at_sender=True)
 
 
 async def handle_at_selection(
     bot: Bot,
     event: GroupMessageEvent,
     at_user_id: int,
-    protected_users: list[int],
-    taken_users: list[int],
+    protected_users: frozenset[int],
+    graph: RelationshipGraph,
 ) -> int | None:
     """
     处理通过 @ 指定群友的逻辑
@@ -283,7 +273,7 @@ async def handle_at_selection(
     :param event: 消息事件
     :param at_user_id: 被 @ 的用户 ID
     :param protected_users: 受保护的用户列表
-    :param taken_users: 已被娶的群友列表
+    :param graph: 本群的 CP 关系索引
     :return: 选择的用户 ID 或 None
     """
     user_id = event.user_id
@@ -297,8 +287,8 @@ async def handle_at_selection(
     if at_user_id in protected_users:
         return None
 
-    # 检查是否已被娶
-    if at_user_id in taken_users:
+    # 检查是否已被娶或已有CP
+    if graph.is_paired(at_user_id):
         return None
 
     # 随机选择逻辑
@@ -317,14 +307,23 @@ async def clean_cd_cache():
         }
 
 
-from nonebot_plugin_apscheduler import scheduler
-
 on_command("重置记录", permission=SUPERUSER, block=True).append_handler(mo_reset_record)
 
-
-def setup_scheduler():
-    scheduler.add_job(
-        reset_record, "cron", hour=0, minute=0, misfire_grace_time=300, coalesce=True
-    )
-
-    scheduler.add_job(clean_cd_cache, "interval", hours=1, coalesce=True)
+# CP关系按天区分，零点无需重置；往日记录在低峰期分批清理
+scheduler.add_job(
+    purge_expired_records,
+    "cron",
+    hour=settings.waifu_purge_hour,
+    id="waifu_purge",
+    replace_existing=True,
+    misfire_grace_time=3600,
+    coalesce=True,
+)
+scheduler.add_job(
+    clean_cd_cache,
+    "interval",
+    hours=1,
+    id="waifu_clean_cd_cache",
+    replace_existing=True,
+    coalesce=True,
+)
@@ -0,0 +1,222 @@
+"""QQ 头像磁盘缓存"""
+
+import asyncio
+import hashlib
+import os
+import time
+from collections import Counter, OrderedDict
+from pathlib import Path
+from typing import NamedTuple
+
+import anyio
+import ujson as json
+from nonebot import get_driver, logger
+from nonebot_plugin_localstore import get_cache_dir
+
+AVATAR_URL = "https://q1.qlogo.cn/g?b=qq&nk={user_id}&s={size}"
+# 未设置头像时 640px 接口返回的默认图片
+DEFAULT_AVATAR_MD5 = "acef72340ac0e914090bd35799f5594e"
+
+
+class AvatarEntry(NamedTuple):
+    digest: str  # 图片内容的 md5，同时作为磁盘文件名
+    size: int  # 实际使用的头像尺寸 (640/100)
+    expires_at: float
+
+
+class AvatarCache:
+    """
+    按 user_id 缓存头像
+
+    图片按内容 md5 存储，相同图片（如默认头像）只存一份；
+    索引按最近使用排序，磁盘占用超过 `max_bytes` 时淘汰最久未使用的用户。
+    索引每写入 `save_every` 次落盘一次，异常退出后未被索引引用的文件
+    会在下次加载时保留为孤儿，超过 `ttl` 或需要腾出空间时才删除。
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        ttl: int = 86400,
+        max_bytes: int = 256 << 20,
+        save_every: int = 20,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.save_every = save_every
+        self.index_path = path / "index.json"
+        self._index: OrderedDict[int, AvatarEntry] = OrderedDict()
+        self._blob_sizes: dict[str, int] = {}
+        self._refs: Counter[str] = Counter()
+        # 磁盘上存在但没有用户引用的文件
+        self._orphans: set[str] = set()
+        # 正在写入磁盘的文件
+        self._writing: dict[str, asyncio.Future[None]] = {}
+        self._total = 0
+        self._dirty = 0
+        self._loaded = False
+        self._load_lock = asyncio.Lock()
+        self._save_lock = asyncio.Lock()
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.path / f"{digest}.img"
+
+    def _read_disk(self) -> tuple[dict[str, os.stat_result], dict[str, list]]:
+        """读取磁盘上的文件与索引（在线程中执行）"""
+        self.path.mkdir(parents=True, exist_ok=True)
+        blobs = {file.stem: file.stat() for file in self.path.glob("*.img")}
+
+        raw: dict[str, list] = {}
+        if self.index_path.exists():
+            try:
+                raw = json.loads(self.index_path.read_text("utf-8"))
+            except ValueError:
+                logger.warning("头像缓存索引解析失败，已忽略")
+        return blobs, raw
+
+    def _unlink_blobs(self, digests: list[str]):
+        for digest in digests:
+            self._blob_path(digest).unlink(missing_ok=True)
+
+    async def load(self):
+        async with self._load_lock:
+            if self._loaded:
+                return
+            blobs, raw = await asyncio.to_thread(self._read_disk)
+            for user_id, entry in raw.items():
+                if entry[0] in blobs:
+                    self._index[int(user_id)] = AvatarEntry(*entry)
+                    self._refs[entry[0]] += 1
+
+            # 未被索引引用的文件（如异常退出前写入的）先保留，过期的才删除
+            expired_before = time.time() - self.ttl
+            stale = [
+                digest
+                for digest, stat in blobs.items()
+                if digest not in self._refs and stat.st_mtime < expired_before
+            ]
+            await asyncio.to_thread(self._unlink_blobs, stale)
+            for digest in stale:
+                del blobs[digest]
+
+            self._blob_sizes = {digest: stat.st_size for digest, stat in blobs.items()}
+            self._orphans = set(blobs) - set(self._refs)
+            self._total = sum(self._blob_sizes.values())
+            self._loaded = True
+
+    def _write_index(self, data: str):
+        tmp = self.index_path.with_suffix(".tmp")
+        tmp.write_text(data, "utf-8")
+        os.replace(tmp, self.index_path)
+
+    async def save(self):
+        if not self._loaded:
+            return
+        self._dirty = 0
+        data = json.dumps({str(k): list(v) for k, v in self._index.items()})
+        async with self._save_lock:
+            try:
+                await asyncio.to_thread(self._write_index, data)
+            except OSError:
+                logger.opt(exception=True).warning("头像缓存索引保存失败")
+
+    def _release(self, digest: str):
+        self._refs[digest] -= 1
+        if self._refs[digest] <= 0:
+            del self._refs[digest]
+            self._total -= self._blob_sizes.pop(digest, 0)
+            self._blob_path(digest).unlink(missing_ok=True)
+
+    def _evict(self):
+        # 优先删除孤儿文件
+        while self._total > self.max_bytes and self._orphans:
+            digest = self._orphans.pop()
+            self._total -= self._blob_sizes.pop(digest, 0)
+            self._blob_path(digest).unlink(missing_ok=True)
+        while self._total > self.max_bytes and len(self._index) > 1:
+            _, entry = self._index.popitem(last=False)
+            self._release(entry.digest)
+
+    async def _fetch(self, user_id: int) -> tuple[int, bytes]:
+        from .utils import download_url
+
+        data = await download_url(AVATAR_URL.format(user_id=user_id, size=640))
+        if hashlib.md5(data, usedforsecurity=False).hexdigest() == DEFAULT_AVATAR_MD5:
+            return 100, await download_url(AVATAR_URL.format(user_id=user_id, size=100))
+        return 640, data
+
+    async def _read(self, user_id: int) -> bytes | None:
+        entry = self._index.get(user_id)
+        if entry is None or entry.expires_at <= time.time():
+            return None
+        self._index.move_to_end(user_id)
+        try:
+            if (writing := self._writing.get(entry.digest)) is not None:
+                await asyncio.shield(writing)
+            return await anyio.Path(self._blob_path(entry.digest)).read_bytes()
+        except OSError:
+            # 读取前被并发淘汰或写入失败，按未命中处理
+            if self._index.get(user_id) == entry:
+                del self._index[user_id]
+                self._release(entry.digest)
+            return None
+
+    async def _store(self, digest: str, data: bytes) -> bool:
+        """保证文件已写入磁盘，调用前需先持有该文件的引用"""
+        self._orphans.discard(digest)
+        if (writing := self._writing.get(digest)) is not None:
+            try:
+                await asyncio.shield(writing)
+            except OSError:
+                return False
+            return True
+        if digest in self._blob_sizes:
+            return True
+
+        self._blob_sizes[digest] = len(data)
+        self._total += len(data)
+        writing = asyncio.ensure_future(
+            anyio.Path(self._blob_path(digest)).write_bytes(data)
+        )
+        self._writing[digest] = writing
+        try:
+            await writing
+        except OSError:
+            logger.opt(exception=True).warning("头像写入磁盘失败")
+            self._total -= self._blob_sizes.pop(digest, 0)
+            return False
+        finally:
+            del self._writing[digest]
+        return True
+
+    async def get(self, user_id: int) -> bytes:
+        if not self._loaded:
+            await self.load()
+
+        if (data := await self._read(user_id)) is not None:
+            return data
+
+        size, data = await self._fetch(user_id)
+        digest = hashlib.md5(data, usedforsecurity=False).hexdigest()
+        # 先持有引用，避免写入期间被并发淘汰
+        self._refs[digest] += 1
+        if not await self._store(digest, data):
+            self._refs[digest] -= 1
+            if self._refs[digest] <= 0:
+                del self._refs[digest]
+            return data
+
+        if (old := self._index.pop(user_id, None)) is not None:
+            self._release(old.digest)
+        self._index[user_id] = AvatarEntry(digest, size, time.time() + self.ttl)
+        self._evict()
+
+        self._dirty += 1
+        if self._dirty >= self.save_every:
+            await self.save()
+        return data
+
+
+avatar_cache = AvatarCache(get_cache_dir("waifu") / "avatar")
+get_driver().on_shutdown(avatar_cache.save)
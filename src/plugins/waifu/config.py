@@ -14,6 +14,9 @@ class Config(BaseModel, extra="ignore"):
     yinpa_cd: int = 300
     yinpa_he: int = 60
     free_divorce_reset_hour: int = 4
+    # 清理往日CP关系的时间（时）与每批删除行数
+    waifu_purge_hour: int = 5
+    waifu_purge_chunk_size: int = 500
 
 
 settings = Config()
@@ -1,11 +1,8 @@
-from nonebot import on_fullmatch, require
+from nonebot import on_fullmatch
 from nonebot.adapters.onebot.v11 import Bot, GroupMessageEvent, MessageSegment
 
-require("nonebot_plugin_orm")
-from nonebot_plugin_orm import get_session
-from sqlalchemy import select
-
-from .models import WaifuRelationship
+from ..group_member.cache import get_member_names
+from .relationship import relationship_index
 from .utils import bbcode_to_png
 
 cp_list = on_fullmatch(("本群cp", "本群CP"), block=True)
@@ -15,37 +12,24 @@ cp_list = on_fullmatch(("本群cp", "本群CP"), block=True)
 async def show_cp_list(bot: Bot, event: GroupMessageEvent):
     group_id = event.group_id
 
-    async with get_session() as session:
-        # 获取CP数据
-        cp_stmt = select(WaifuRelationship).where(
-            WaifuRelationship.group_id == group_id
+    # 获取CP数据
+    graph = await relationship_index.get(group_id)
+    pairs = graph.pairs()
+
+    # 生成消息内容
+    content = "[size=40][b]本群CP列表[/b][/size]\n"
+    content += "────────────────\n"
+
+    if not pairs:
+        content += "暂无CP记录"
+    else:
+        names = await get_member_names(
+            bot, group_id, {user_id for pair in pairs for user_id in pair}
         )
-        cp_result = await session.execute(cp_stmt)
-        relationships = cp_result.fetchall()
-
-        # 生成消息内容
-        content = "[size=40][b]本群CP列表[/b][/size]\n"
-        content += "────────────────\n"
-
-        if not relationships:
-            content += "暂无CP记录"
-        else:
-            for relationship_tuple in relationships:
-                relationship = relationship_tuple[0]
-                user_id = relationship.user_id
-                partner_id = relationship.partner_id
-
-                try:
-                    user = await bot.get_group_member_info(
-                        group_id=group_id, user_id=user_id
-                    )
-                    partner = await bot.get_group_member_info(
-                        group_id=group_id, user_id=partner_id
-                    )
-                    content += f"❤ {user['card'] or user['nickname']} ↔ {partner['card'] or partner['nickname']}\n"
-                except Exception:
-                    # 如果用户不在群里了，跳过
-                    continue
+        for user_id, partner_id in pairs:
+            # 如果用户不在群里了，跳过
+            if user_id in names and partner_id in names:
+                content += f"❤ {names[user_id]} ↔ {names[partner_id]}\n"
 
     # 生成图片
     img_bytes = bbcode_to_png(content)
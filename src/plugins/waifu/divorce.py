@@ -1,17 +1,18 @@
 import random
 import time
-from datetime import datetime
+from datetime import date, datetime
 
 from cachetools import TTLCache
 from nonebot import on_command, require
 from nonebot.adapters.onebot.v11 import GroupMessageEvent
 
 require("nonebot_plugin_orm")
-from nonebot_plugin_orm import get_session
-from sqlalchemy import delete, select
+from sqlalchemy import delete
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..coin.api import subtract_coin
+from ..coin.api import subtract_coin, transaction
 from .models import WaifuLock, WaifuRelationship
+from .relationship import relationship_index
 
 # 初始化全局缓存
 last_reset_cache = TTLCache(maxsize=1000, ttl=86400)  # 24小时过期
@@ -36,47 +37,46 @@ async def handle_divorce(event: GroupMessageEvent):
         divorce_count_cache.clear()
         divorce_last_reset_date = today
 
-    async with get_session() as session:
-        # 检查是否有CP关系（主动方或被动方）
-        relationship_stmt = (
-            select(WaifuRelationship)
-            .where(
-                WaifuRelationship.group_id == group_id,
-                (
-                    (WaifuRelationship.user_id == user_id)
-                    | (WaifuRelationship.partner_id == user_id)
-                ),
-            )
-            .limit(1)
-        )
-        relationship_result = await session.execute(relationship_stmt)
-        relationship = relationship_result.scalar_one_or_none()
-
-    if not relationship:
+    # 检查是否有CP关系（主动方或被动方）
+    graph = await relationship_index.get(group_id)
+    partner_id = graph.partner_of(user_id)
+    if partner_id is None:
         await bye.finish("你还没结婚呢...", at_sender=True)
 
     success = False
 
-    # 正常CD逻辑
-    if not check_divorce_cd(user_id):
-        # 计算今日离婚次数和花费
-        count = divorce_count_cache.get(user_id, 0)
-        cost = 200 * (2**count)
-        # 检查并扣除 cost 次元币
-        success, remaining_coin = await subtract_coin(str(user_id), float(cost))
-        if not success:
-            await bye.finish(
-                f"离婚冷静期还没过呢... 本次需要 {cost} 次元币。", at_sender=True
-            )  # 这里直接退出
+    # 扣除次元币与删除关系在同一事务中提交
+    async with transaction() as session:
+        # 正常CD逻辑
+        if not check_divorce_cd(user_id):
+            # 计算今日离婚次数和花费
+            count = divorce_count_cache.get(user_id, 0)
+            cost = 200 * (2**count)
+            # 检查并扣除 cost 次元币
+            success, remaining_coin = await subtract_coin(
+                str(user_id),
+                float(cost),
+                reason="离婚",
+                source="waifu",
+                session=session,
+            )
+            if not success:
+                await bye.finish(
+                    f"离婚冷静期还没过呢... 本次需要 {cost} 次元币。", at_sender=True
+                )  # 这里直接退出
+
+        # 执行离婚
+        await process_divorce(group_id, user_id, partner_id, graph.day, session)
+    # 事务提交后再更新索引
+    graph.remove(user_id)
+
+    if success:
         divorce_count_cache[user_id] = count + 1
         await bye.send(
             f"离婚冷静期还没过呢... 不过你花费了 {cost} 次元币（今日第 {count + 1} 次），剩余 {remaining_coin} 次元币。",
             at_sender=True,
         )
-
-    # 执行离婚
-    await process_divorce(group_id, user_id)
-    if not success:
+    else:
         await bye.finish(random.choice(["嗯。", "...", "好。", "哦。", "行。"]))
 
 
@@ -93,54 +93,35 @@ def check_divorce_cd(user_id: int) -> bool:
     return True
 
 
-async def process_divorce(group_id: int, user_id: int):
+async def process_divorce(
+    group_id: int, user_id: int, partner_id: int, day: date, session: AsyncSession
+):
     """
-    处理离婚逻辑
+    处理离婚逻辑（由调用方提交）
     :param group_id: 群组 ID
     :param user_id: 用户 ID
+    :param partner_id: 用户的 CP
+    :param day: CP 关系所属日期
+    :param session: 共用的会话
     """
-    async with get_session() as session:
-        # 查找并删除CP关系记录（主动方或被动方）
-        relationship_stmt = (
-            select(WaifuRelationship)
-            .where(
-                WaifuRelationship.group_id == group_id,
-                (
-                    (WaifuRelationship.user_id == user_id)
-                    | (WaifuRelationship.partner_id == user_id)
-                ),
-            )
-            .limit(1)
+    # 删除双向关系记录
+    delete_stmt = delete(WaifuRelationship).where(
+        WaifuRelationship.group_id == group_id,
+        WaifuRelationship.day == day,
+        (
+            (WaifuRelationship.user_id == user_id)
+            & (WaifuRelationship.partner_id == partner_id)
         )
-        relationship_result = await session.execute(relationship_stmt)
-        relationship = relationship_result.scalar_one_or_none()
-
-        if relationship:
-            # 确定双方的ID
-            if relationship.user_id == user_id:
-                partner_id = relationship.partner_id
-            else:
-                partner_id = relationship.user_id
-
-            # 删除双向关系记录
-            delete_stmt = delete(WaifuRelationship).where(
-                WaifuRelationship.group_id == group_id,
-                (
-                    (WaifuRelationship.user_id == user_id)
-                    & (WaifuRelationship.partner_id == partner_id)
-                )
-                | (
-                    (WaifuRelationship.user_id == partner_id)
-                    & (WaifuRelationship.partner_id == user_id)
-                ),
-            )
-            await session.execute(delete_stmt)
-
-            # 删除相关的锁定记录
-            lock_delete_stmt = delete(WaifuLock).where(
-                WaifuLock.group_id == group_id,
-                (WaifuLock.user_id.in_([user_id, partner_id])),
-            )
-            await session.execute(lock_delete_stmt)
-
-        await session.commit()
+        | (
+            (WaifuRelationship.user_id == partner_id)
+            & (WaifuRelationship.partner_id == user_id)
+        ),
+    )
+    await session.execute(delete_stmt)
+
+    # 删除相关的锁定记录
+    lock_delete_stmt = delete(WaifuLock).where(
+        WaifuLock.group_id == group_id,
+        (WaifuLock.user_id.in_([user_id, partner_id])),
+    )
+    await session.execute(lock_delete_stmt)
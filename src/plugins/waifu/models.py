@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import date, datetime
 from zoneinfo import ZoneInfo
 
 from nonebot import require
@@ -6,7 +6,15 @@ from nonebot import require
 require("nonebot_plugin_orm")
 
 from nonebot_plugin_orm import Model
-from sqlalchemy import BigInteger, Boolean, DateTime, Index, String, UniqueConstraint
+from sqlalchemy import (
+    BigInteger,
+    Boolean,
+    Date,
+    DateTime,
+    Index,
+    String,
+    UniqueConstraint,
+)
 from sqlalchemy.orm import Mapped, mapped_column
 
 
@@ -15,8 +23,13 @@ def get_current_time():
     return datetime.now(ZoneInfo("Asia/Shanghai"))
 
 
+def get_current_day() -> date:
+    """获取当前日期（亚洲/上海时区）"""
+    return get_current_time().date()
+
+
 class WaifuRelationship(Model):
-    """娶群友关系表 - 记录用户之间的CP关系"""
+    """娶群友关系表 - 按天记录用户之间的CP关系，只有当天的关系有效"""
 
     __tablename__ = "waifu_relationships"
 
@@ -24,19 +37,18 @@ class WaifuRelationship(Model):
     group_id: Mapped[int] = mapped_column(BigInteger, nullable=False, index=True)
     user_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
     partner_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    day: Mapped[date] = mapped_column(Date, default=get_current_day, nullable=False)
     created_at: Mapped[datetime] = mapped_column(
         DateTime, default=get_current_time, nullable=False
     )
 
     __table_args__ = (
-        # 确保同一群组中，一个用户只能有一个CP
-        UniqueConstraint("group_id", "user_id", name="uq_group_user"),
-        # 确保同一群组中，一个用户不能被多个人娶
-        UniqueConstraint("group_id", "partner_id", name="uq_group_partner"),
-        # 添加索引优化查询性能
-        Index("ix_group_user", "group_id", "user_id"),
-        Index("ix_group_partner", "group_id", "partner_id"),
-        Index("ix_created_at", "created_at"),
+        # 确保同一群组中，一个用户每天只能有一个CP
+        UniqueConstraint("group_id", "day", "user_id", name="uq_group_day_user"),
+        # 确保同一群组中，一个用户每天不能被多个人娶
+        UniqueConstraint("group_id", "day", "partner_id", name="uq_group_day_partner"),
+        # 清理往日记录
+        Index("ix_relationship_day", "day"),
     )
 
 
@@ -0,0 +1,94 @@
+"""按群缓存的 CP 关系双向索引"""
+
+from datetime import date
+
+from nonebot import require
+
+require("nonebot_plugin_orm")
+from nonebot_plugin_orm import get_session
+from sqlalchemy import select
+
+from .models import WaifuRelationship, get_current_day
+
+
+class RelationshipGraph:
+    """单个群某一天的 CP 关系，user_id -> partner_id 与 partner_id -> user_id 双向索引"""
+
+    def __init__(self, day: date, pairs: list[tuple[int, int]]):
+        self.day = day
+        self.forward: dict[int, int] = dict(pairs)
+        self.backward: dict[int, int] = {
+            partner_id: user_id for user_id, partner_id in pairs
+        }
+
+    def partner_of(self, user_id: int) -> int | None:
+        """获取用户的 CP（不论是主动方还是被动方）"""
+        partner_id = self.forward.get(user_id)
+        return partner_id if partner_id is not None else self.backward.get(user_id)
+
+    def is_paired(self, user_id: int) -> bool:
+        return user_id in self.forward or user_id in self.backward
+
+    def pairs(self) -> list[tuple[int, int]]:
+        return list(self.forward.items())
+
+    def add(self, user_id: int, partner_id: int):
+        self.forward[user_id] = partner_id
+        self.backward[partner_id] = user_id
+
+    def discard(self, user_id: int, partner_id: int):
+        """仅当索引中仍是这对关系时才移除，用于回滚自己写入的条目"""
+        if self.forward.get(user_id) == partner_id:
+            del self.forward[user_id]
+        if self.backward.get(partner_id) == user_id:
+            del self.backward[partner_id]
+
+    def remove(self, user_id: int) -> int | None:
+        """解除用户的 CP 关系，返回原 CP"""
+        if (partner_id := self.forward.pop(user_id, None)) is not None:
+            self.backward.pop(partner_id, None)
+            return partner_id
+        if (partner_id := self.backward.pop(user_id, None)) is not None:
+            self.forward.pop(partner_id, None)
+            return partner_id
+        return None
+
+
+class RelationshipIndex:
+    """
+    :说明: `RelationshipIndex`
+    > 各群当天 CP 关系的内存索引，首次访问某群时从数据库加载
+
+    结婚、离婚由调用方在写库时同步更新（write-through）；
+    跨天后整体丢弃，往日记录由定时任务慢慢清理，不影响当天的查询。
+    """
+
+    def __init__(self):
+        self._day: date | None = None
+        self._groups: dict[int, RelationshipGraph] = {}
+
+    async def get(self, group_id: int) -> RelationshipGraph:
+        day = get_current_day()
+        if day != self._day:
+            self._groups.clear()
+            self._day = day
+        elif (graph := self._groups.get(group_id)) is not None:
+            return graph
+
+        async with get_session() as session:
+            result = await session.execute(
+                select(WaifuRelationship.user_id, WaifuRelationship.partner_id).where(
+                    WaifuRelationship.group_id == group_id,
+                    WaifuRelationship.day == day,
+                )
+            )
+            pairs = list(result.tuples())
+        graph = RelationshipGraph(day, pairs)
+        if day != self._day:
+            # 加载期间跨天，不缓存旧一天的关系
+            return graph
+        # 并发加载时以先完成的为准，避免覆盖期间写入的关系
+        return self._groups.setdefault(group_id, graph)
+
+
+relationship_index = RelationshipIndex()
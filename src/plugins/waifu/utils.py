@@ -1,44 +1,38 @@
 import asyncio
-import hashlib
 import io
 
-import httpx
-from nonebot import logger
+from cachetools import TTLCache
 from nonebot.adapters.onebot.v11 import Message
 from pil_utils import Text2Image
 
-defualt_md5 = "acef72340ac0e914090bd35799f5594e"
+from U1.utils.request import get_client
+
+# 各群受保护用户。仓库内没有写入 WaifuProtectedUser 的代码（由外部直接改库维护），
+# 目前只依赖 TTL 失效；新增写入路径时需调用 invalidate_protected_users
+protected_cache: TTLCache[int, frozenset[int]] = TTLCache(maxsize=1000, ttl=3600)
 
 
 async def download_avatar(user_id: int) -> bytes:
-    url = f"https://q1.qlogo.cn/g?b=qq&nk={user_id}&s=640"
-    data = await download_url(url)
-    if hashlib.md5(data, usedforsecurity=False).hexdigest() == defualt_md5:
-        url = f"https://q1.qlogo.cn/g?b=qq&nk={user_id}&s=100"
-        data = await download_url(url)
-    return data
+    from .avatar import avatar_cache
+
+    return await avatar_cache.get(user_id)
 
 
 async def download_url(url: str) -> bytes:
-    async with httpx.AsyncClient() as client:
-        for _ in range(3):
-            try:
-                resp = await client.get(url, timeout=20)
-                resp.raise_for_status()
-                return resp.content
-            except Exception:
-                await asyncio.sleep(3)
+    client = get_client(url)
+    for _ in range(3):
+        try:
+            resp = await client.get(url, timeout=20)
+            resp.raise_for_status()
+            return resp.content
+        except Exception:
+            await asyncio.sleep(3)
     raise Exception(f"{url} 下载失败！")
 
 
-async def user_img(user_id: int) -> str:
-    """获取用户头像url"""
-    url = f"https://q1.qlogo.cn/g?b=qq&nk={user_id}&s=640"
-    data = await download_url(url)
-    if hashlib.md5(data, usedforsecurity=False).hexdigest() == defualt_md5:
-        url = f"https://q1.qlogo.cn/g?b=qq&nk={user_id}&s=100"
-    logger.info(f"头像url: {url}")
-    return url
+async def user_img(user_id: int) -> bytes:
+    """获取用户头像（优先读取磁盘缓存）"""
+    return await download_avatar(user_id)
 
 
 def text_to_png(msg):
@@ -89,7 +83,11 @@ def get_bi_mapping_contains(data: dict, input_value: int) -> bool:
     return input_str in k_to_v or input_str in v_to_k
 
 
-async def get_protected_users(group_id: int) -> list[int]:
+async def get_protected_users(group_id: int) -> frozenset[int]:
+    """获取群内受保护的用户（带缓存，娶群友与透群友共用）"""
+    if (protected := protected_cache.get(group_id)) is not None:
+        return protected
+
     from nonebot import require
 
     require("nonebot_plugin_orm")
@@ -103,4 +101,15 @@ async def get_protected_users(group_id: int) -> list[int]:
             WaifuProtectedUser.group_id == group_id
         )
         result = await session.execute(stmt)
-        return [row[0] for row in result.fetchall()]
+        protected = frozenset(result.scalars())
+
+    protected_cache[group_id] = protected
+    return protected
+
+
+def invalidate_protected_users(group_id: int | None = None):
+    """受保护用户变更后丢弃缓存，默认丢弃全部群"""
+    if group_id is None:
+        protected_cache.clear()
+    else:
+        protected_cache.pop(group_id, None)
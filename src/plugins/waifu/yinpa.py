@@ -9,6 +9,7 @@ require("nonebot_plugin_orm")
 from nonebot_plugin_orm import get_session
 from sqlalchemy import select
 
+from ..group_member.cache import get_member_name, get_members
 from .config import settings
 from .models import YinpaActive, YinpaPassive
 from .utils import get_message_at, get_protected_users, user_img
@@ -82,7 +83,10 @@ async def handle_yinpa(bot: Bot, event: GroupMessageEvent):
 
 
 async def get_available_members(
-    bot: Bot, group_id: int, protected: list[int], exclude: list[int] | None = None
+    bot: Bot,
+    group_id: int,
+    protected: frozenset[int],
+    exclude: list[int] | None = None,
 ) -> list[int]:
     """
     获取可用的群成员列表
@@ -92,15 +96,10 @@ async def get_available_members(
     :param exclude: 需要排除的用户列表
     :return: 可用的用户 ID 列表
     """
-    exclude = exclude or []
-    members = await bot.get_group_member_list(group_id=group_id)
-    return [
-        member["user_id"]
-        for member in members
-        if member["user_id"] not in protected
-        and member["user_id"] not in exclude
-        and member["user_id"] != int(bot.self_id)  # 排除机器人
-    ]
+    # 受保护用户、指定排除的用户和机器人自己
+    excluded = protected.union(exclude or (), (int(bot.self_id),))
+    members = await get_members(bot, group_id)
+    return [member.user_id for member in members if member.user_id not in excluded]
 
 
 def check_yinpa_cd(event: GroupMessageEvent) -> bool:
@@ -124,8 +123,7 @@ async def generate_yinpa_result(
 ) -> Message:
     """生成涩涩结果消息"""
     # 获取目标用户信息
-    member = await bot.get_group_member_info(group_id=event.group_id, user_id=target)
-    target_name = member["card"] or member["nickname"]
+    target_name = await get_member_name(bot, event.group_id, target) or target
 
     if success:
         success_messages = [
@@ -137,9 +135,9 @@ async def generate_yinpa_result(
             "任务达成！",
         ]
         msg = (
-            f"{random.choice(success_messages)}\n"
-            f"{MessageSegment.image(await user_img(target))}"
-            f"目标：『{target_name}』\n"
+            Message(f"{random.choice(success_messages)}\n")
+            + MessageSegment.image(await user_img(target))
+            + f"目标：『{target_name}』\n"
             f"结果：成功 {random.choice(['🥵', '😋', '🤤', '💕', '✨'])}"
         )
     else:
@@ -152,10 +150,10 @@ async def generate_yinpa_result(
             "计划败露！",
         ]
         msg = (
-            f"{random.choice(fail_messages)}\n"
-            f"{MessageSegment.image(await user_img(target))}"
-            f"目标：『{target_name}』\n"
+            Message(f"{random.choice(fail_messages)}\n")
+            + MessageSegment.image(await user_img(target))
+            + f"目标：『{target_name}』\n"
             f"结果：失败 {random.choice(['😭', '😨', '💔', '😵', '🤕'])}"
         )
 
-    return Message(msg)
+    return msg